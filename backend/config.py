@@ -31,8 +31,14 @@ class Config:
             'check_same_thread': False,  # 允许跨线程使用（仅SQLite）
             'timeout': 30  # 增加超时时间
         },
-        'pool_pre_ping': True,  # 连接前检查
+        # 本地 SQLite 文件连接不会被服务端断开，无需每次取连接前执行 SELECT 1 探活；
+        # 通过 DATABASE_URL 指向数据库服务器时仍需探活，避免使用被服务端关闭的连接
+        'pool_pre_ping': not SQLALCHEMY_DATABASE_URI.startswith('sqlite'),
         'pool_recycle': 3600,  # 1小时回收连接
+        # 连接池需容纳共享 AI 线程池（MAX_AI_CALL_WORKERS）的工作线程、后台任务线程和请求线程，
+        # 避免后台任务并发较高时等待连接超时
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '40')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
     }
     
     # 文件存储配置
@@ -81,6 +87,8 @@ class Config:
     # 并发配置
     MAX_DESCRIPTION_WORKERS = int(os.getenv('MAX_DESCRIPTION_WORKERS', '5'))
     MAX_IMAGE_WORKERS = int(os.getenv('MAX_IMAGE_WORKERS', '8'))
+    # 所有后台任务共享的 AI 调用线程池大小（单个任务的并发仍受上面两项限制）
+    MAX_AI_CALL_WORKERS = int(os.getenv('MAX_AI_CALL_WORKERS', '32'))
     
     # 图片生成配置
     DEFAULT_ASPECT_RATIO = "16:9"
@@ -107,6 +115,11 @@ class Config:
     # 注意: 可编辑PPTX导出功能使用 ImageEditabilityService，其中 HybridInpaintProvider 会结合百度重绘和生成式质量增强
     INPAINTING_PROVIDER = os.getenv('INPAINTING_PROVIDER', 'gemini')  # 默认使用 Gemini
 
+    # 可编辑PPTX导出中生成式重绘的分块配置：开启后大图按正方形分块重绘再拼接（默认关闭）
+    GENERATIVE_INPAINT_TILED = os.getenv('GENERATIVE_INPAINT_TILED', 'false').lower() == 'true'
+    GENERATIVE_INPAINT_TILE_SIZE = int(os.getenv('GENERATIVE_INPAINT_TILE_SIZE', '1024'))
+    GENERATIVE_INPAINT_TILE_OVERLAP = int(os.getenv('GENERATIVE_INPAINT_TILE_OVERLAP', '128'))
+
     # 百度 API 配置（用于 OCR 和图像修复）
     BAIDU_OCR_API_KEY = os.getenv('BAIDU_OCR_API_KEY', '')
 
@@ -703,8 +703,8 @@ def set_current_image_version(project_id, page_id, version_id):
         if not version or version.page_id != page_id:
             return not_found('Image Version')
         
-        # Mark all versions as not current
-        PageImageVersion.query.filter_by(page_id=page_id).update({'is_current': False})
+        # Mark the current version as not current
+        PageImageVersion.query.filter_by(page_id=page_id, is_current=True).update({'is_current': False})
 
         # Set this version as current
         version.is_current = True
@@ -783,7 +783,8 @@ def regenerate_renovation_page(project_id, page_id):
         # Step 1: Parse page PDF → markdown
         logger.info(f"Regenerating renovation page {page.order_index + 1}: parsing PDF...")
         filename = f"page_{page.order_index + 1}.pdf"
-        _batch_id, md_text, extract_id, error_msg, _failed = file_parser_service.parse_file(
+        # Header/footer text from layout.json is supplemented in the same parse
+        _batch_id, md_text, _extract_id, error_msg, _failed = file_parser_service.parse_file_with_header_footer(
             str(page_pdf_path), filename
         )
 
@@ -792,12 +793,6 @@ def regenerate_renovation_page(project_id, page_id):
 
         md_text = md_text or ''
 
-        # Supplement with header/footer from layout.json
-        if extract_id:
-            hf_text = file_parser_service.extract_header_footer_from_layout(extract_id)
-            if hf_text:
-                md_text = hf_text + '\n\n' + md_text
-
         if not md_text.strip():
             return error_response('PARSE_ERROR', f"Failed to extract content from page {page.order_index + 1}", 400)
 
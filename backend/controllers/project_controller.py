@@ -1242,6 +1242,8 @@ def create_ppt_renovation_project():
         )
 
         language = request.form.get('language', current_app.config.get('OUTPUT_LANGUAGE', 'zh'))
+        # 逐页流水线的瓶颈是外部 API 调用，并发上限跟随用户设置的描述生成并发数
+        max_workers = current_app.config.get('MAX_DESCRIPTION_WORKERS', 5)
         app = current_app._get_current_object()
 
         # Submit async task
@@ -1253,7 +1255,7 @@ def create_ppt_renovation_project():
             file_service,
             file_parser_service,
             keep_layout,
-            5,  # max_workers
+            max_workers,
             app,
             language
         )
@@ -2,6 +2,7 @@
 Template Controller - handles template-related endpoints
 """
 import logging
+import traceback
 from flask import Blueprint, request, current_app
 from models import db, Project, UserTemplate
 from utils import success_response, error_response, not_found, bad_request, allowed_file
@@ -164,7 +165,6 @@ def upload_user_template():
         return success_response(template.to_dict())
     
     except Exception as e:
-        import traceback
         db.session.rollback()
         error_msg = str(e)
         logger.error(f"Error uploading user template: {error_msg}", exc_info=True)
@@ -32,6 +32,13 @@ class Page(db.Model):
                                      lazy='dynamic', cascade='all, delete-orphan',
                                      order_by='PageImageVersion.version_number.desc()')
     
+    @staticmethod
+    def serialize_json(data):
+        """Serialize outline/description content to the stored JSON string (None if empty)"""
+        if data:
+            return json.dumps(data, ensure_ascii=False)
+        return None
+    
     def get_outline_content(self):
         """Parse outline_content from JSON string"""
         if self.outline_content:
@@ -43,10 +50,7 @@ class Page(db.Model):
     
     def set_outline_content(self, data):
         """Set outline_content as JSON string"""
-        if data:
-            self.outline_content = json.dumps(data, ensure_ascii=False)
-        else:
-            self.outline_content = None
+        self.outline_content = self.serialize_json(data)
     
     def get_description_content(self):
         """Parse description_content from JSON string"""
@@ -59,10 +63,7 @@ class Page(db.Model):
     
     def set_description_content(self, data):
         """Set description_content as JSON string"""
-        if data:
-            self.description_content = json.dumps(data, ensure_ascii=False)
-        else:
-            self.description_content = None
+        self.description_content = self.serialize_json(data)
     
     def to_dict(self, include_versions=False):
         """Convert to dictionary"""
@@ -19,6 +19,8 @@ import os
 import logging
 from typing import Any, Dict, Optional
 
+from flask import current_app, has_app_context
+
 from .text import TextProvider, GenAITextProvider, OpenAITextProvider, LazyLLMTextProvider
 from .image import ImageProvider, GenAIImageProvider, OpenAIImageProvider, LazyLLMImageProvider
 
@@ -48,49 +50,53 @@ def get_provider_format() -> str:
         "gemini", "openai", "vertex" or "lazyllm"
     """
     # Try to get from Flask app config first (database settings)
-    try:
-        from flask import current_app
-        if current_app and hasattr(current_app, 'config'):
-            config_value = current_app.config.get('AI_PROVIDER_FORMAT')
-            if config_value:
-                return str(config_value).lower()
-    except RuntimeError:
-        # Not in Flask application context
-        pass
+    if has_app_context():
+        config_value = current_app.config.get('AI_PROVIDER_FORMAT')
+        if config_value:
+            return str(config_value).lower()
 
     # Fallback to environment variable
-    return os.getenv('AI_PROVIDER_FORMAT', 'gemini').lower()
+    return os.environ.get('AI_PROVIDER_FORMAT', 'gemini').lower()
+
+
+def _lookup_setting(key: str, app_config) -> Optional[str]:
+    """Look up *key* in ``app_config`` (may be ``None``) and then the environment."""
+    if app_config is not None:
+        val = app_config.get(key)
+        if val is not None:
+            logger.debug("Setting %s resolved from app.config", key)
+            return str(val)
 
+    env_val = os.environ.get(key)
+    if env_val is not None:
+        logger.debug("Setting %s resolved from environment", key)
+        return env_val
+    return None
 
-def _resolve_setting(key: str, fallback: Optional[str] = None) -> Optional[str]:
+
+def _resolve_setting(*keys: str, fallback: Optional[str] = None) -> Optional[str]:
     """Look up a configuration value using the standard priority chain.
 
     Resolution order:
         1. Flask ``app.config`` (populated from the database Settings page)
         2. OS environment variable
         3. *fallback* argument (may be ``None``)
+
+    Several alias *keys* may be given (e.g. ``'OPENAI_API_KEY', 'GOOGLE_API_KEY'``):
+    the first non-empty value wins, otherwise the last key's result is used.
+    The app context is checked once for the whole chain.
     """
-    # 1) Try Flask app.config
-    try:
-        from flask import current_app
-        if current_app and hasattr(current_app, 'config') and key in current_app.config:
-            val = current_app.config[key]
-            if val is not None:
-                logger.debug("Setting %s resolved from app.config", key)
-                return str(val)
-    except RuntimeError:
-        pass  # outside Flask request context
-
-    # 2) Try environment
-    env_val = os.getenv(key)
-    if env_val is not None:
-        logger.debug("Setting %s resolved from environment", key)
-        return env_val
+    app_config = current_app.config if has_app_context() else None
+    val = None
+    for key in keys:
+        val = _lookup_setting(key, app_config)
+        if val:
+            return val
 
-    # 3) Fallback
-    if fallback is not None:
-        logger.debug("Setting %s using fallback: %s", key, fallback)
-    return fallback
+    if val is None and fallback is not None:
+        logger.debug("Setting %s using fallback: %s", keys[-1], fallback)
+        return fallback
+    return val
 
 
 def _build_provider_config() -> Dict[str, Any]:
@@ -107,8 +113,8 @@ def _build_provider_config() -> Dict[str, Any]:
     cfg: Dict[str, Any] = {'format': fmt}
 
     if fmt == 'openai':
-        cfg['api_key'] = _resolve_setting('OPENAI_API_KEY') or _resolve_setting('GOOGLE_API_KEY')
-        cfg['api_base'] = _resolve_setting('OPENAI_API_BASE', 'https://aihubmix.com/v1')
+        cfg['api_key'] = _resolve_setting('OPENAI_API_KEY', 'GOOGLE_API_KEY')
+        cfg['api_base'] = _resolve_setting('OPENAI_API_BASE', fallback='https://aihubmix.com/v1')
         if not cfg['api_key']:
             raise ValueError(
                 "OPENAI_API_KEY or GOOGLE_API_KEY (from database settings or environment) "
@@ -118,7 +124,7 @@ def _build_provider_config() -> Dict[str, Any]:
 
     elif fmt == 'vertex':
         cfg['project_id'] = _resolve_setting('VERTEX_PROJECT_ID')
-        cfg['location'] = _resolve_setting('VERTEX_LOCATION', 'us-central1')
+        cfg['location'] = _resolve_setting('VERTEX_LOCATION', fallback='us-central1')
         if not cfg['project_id']:
             raise ValueError(
                 "VERTEX_PROJECT_ID must be set when AI_PROVIDER_FORMAT=vertex. "
@@ -128,8 +134,8 @@ def _build_provider_config() -> Dict[str, Any]:
                      cfg['project_id'], cfg['location'])
 
     elif fmt == 'lazyllm':
-        cfg['text_source'] = _resolve_setting('TEXT_MODEL_SOURCE', 'deepseek')
-        cfg['image_source'] = _resolve_setting('IMAGE_MODEL_SOURCE', 'doubao')
+        cfg['text_source'] = _resolve_setting('TEXT_MODEL_SOURCE', fallback='deepseek')
+        cfg['image_source'] = _resolve_setting('IMAGE_MODEL_SOURCE', fallback='doubao')
         logger.info("Provider config — format: lazyllm, text_source: %s, image_source: %s",
                      cfg['text_source'], cfg['image_source'])
 
@@ -176,8 +182,8 @@ def _get_model_type_provider_config(model_type: str) -> Dict[str, Any]:
     source_lower = source.lower()
 
     if source_lower == 'gemini':
-        api_key = _resolve_setting(f'{prefix}_API_KEY') or _resolve_setting('GOOGLE_API_KEY')
-        api_base = _resolve_setting(f'{prefix}_API_BASE') or _resolve_setting('GOOGLE_API_BASE')
+        api_key = _resolve_setting(f'{prefix}_API_KEY', 'GOOGLE_API_KEY')
+        api_base = _resolve_setting(f'{prefix}_API_BASE', 'GOOGLE_API_BASE')
         if not api_key:
             raise ValueError(
                 f"API key is required for {model_type} model with Gemini provider. "
@@ -187,11 +193,9 @@ def _get_model_type_provider_config(model_type: str) -> Dict[str, Any]:
         return {'format': 'gemini', 'api_key': api_key, 'api_base': api_base}
 
     elif source_lower == 'openai':
-        api_key = (_resolve_setting(f'{prefix}_API_KEY')
-                   or _resolve_setting('OPENAI_API_KEY')
-                   or _resolve_setting('GOOGLE_API_KEY'))
-        api_base = (_resolve_setting(f'{prefix}_API_BASE')
-                    or _resolve_setting('OPENAI_API_BASE', 'https://aihubmix.com/v1'))
+        api_key = _resolve_setting(f'{prefix}_API_KEY', 'OPENAI_API_KEY', 'GOOGLE_API_KEY')
+        api_base = _resolve_setting(f'{prefix}_API_BASE', 'OPENAI_API_BASE',
+                                    fallback='https://aihubmix.com/v1')
         if not api_key:
             raise ValueError(
                 f"API key is required for {model_type} model with OpenAI provider. "
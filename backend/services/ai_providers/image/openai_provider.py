@@ -12,13 +12,13 @@ Resolution validation is handled at the task_manager level for all providers.
 import logging
 import base64
 import re
-import requests
 from io import BytesIO
 from typing import Optional, List
 from openai import OpenAI
 from PIL import Image
 from .base import ImageProvider
 from config import get_config
+from utils.http_utils import get_http_session
 
 logger = logging.getLogger(__name__)
 
@@ -239,7 +239,7 @@ class OpenAIImageProvider(ImageProvider):
                         image_url = markdown_matches[0]  # Use the first image URL found
                         logger.debug(f"Found Markdown image URL: {image_url}")
                         try:
-                            response = requests.get(image_url, timeout=30, stream=True)
+                            response = get_http_session().get(image_url, timeout=30, stream=True)
                             response.raise_for_status()
                             image = Image.open(BytesIO(response.content))
                             image.load()  # Ensure image is fully loaded
@@ -255,7 +255,7 @@ class OpenAIImageProvider(ImageProvider):
                         image_url = url_matches[0]
                         logger.debug(f"Found plain image URL: {image_url}")
                         try:
-                            response = requests.get(image_url, timeout=30, stream=True)
+                            response = get_http_session().get(image_url, timeout=30, stream=True)
                             response.raise_for_status()
                             image = Image.open(BytesIO(response.content))
                             image.load()
@@ -7,7 +7,6 @@ import os
 import json
 import re
 import logging
-import requests
 from typing import List, Dict, Optional, Union
 from textwrap import dedent
 from PIL import Image
@@ -28,9 +27,16 @@ from .prompts import (
 )
 from .ai_providers import get_text_provider, get_image_provider, TextProvider, ImageProvider
 from config import get_config
+from utils.http_utils import get_http_session
 
 logger = logging.getLogger(__name__)
 
+# Markdown 图片语法: ![](url) 或 ![alt](url)，模块加载时预编译
+_MARKDOWN_IMAGE_URL_RE = re.compile(r'!\[.*?\]\((.*?)\)')
+_MARKDOWN_IMAGE_RE = re.compile(r'!\[(.*?)\]\([^\)]+\)')
+_EXTRA_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n')
+_IMAGE_URL_PREFIXES = ('http://', 'https://', '/files/')
+
 
 class ProjectContext:
     """项目上下文数据类，统一管理 AI 需要的所有项目信息"""
@@ -141,14 +147,13 @@ class AIService:
             return []
         
         # 匹配 markdown 图片语法: ![](url) 或 ![alt](url)
-        pattern = r'!\[.*?\]\((.*?)\)'
-        matches = re.findall(pattern, text)
+        matches = _MARKDOWN_IMAGE_URL_RE.findall(text)
         
         # 过滤掉空字符串，支持 http/https URL 和 /files/ 开头的本地路径（包括 mineru、materials 等）
         urls = []
         for url in matches:
             url = url.strip()
-            if url and (url.startswith('http://') or url.startswith('https://') or url.startswith('/files/')):
+            if url.startswith(_IMAGE_URL_PREFIXES):
                 urls.append(url)
         
         return urls
@@ -174,11 +179,10 @@ class AIService:
             # 如果有描述文字，保留它；否则删除整个链接
             return alt_text if alt_text else ''
         
-        pattern = r'!\[(.*?)\]\([^\)]+\)'
-        cleaned_text = re.sub(pattern, replace_image, text)
+        cleaned_text = _MARKDOWN_IMAGE_RE.sub(replace_image, text)
         
         # 清理可能产生的多余空行
-        cleaned_text = re.sub(r'\n\s*\n\s*\n', '\n\n', cleaned_text)
+        cleaned_text = _EXTRA_BLANK_LINES_RE.sub('\n\n', cleaned_text)
         
         return cleaned_text
     
@@ -290,7 +294,7 @@ class AIService:
         """
         try:
             logger.debug(f"Downloading image from URL: {url}")
-            response = requests.get(url, timeout=30, stream=True)
+            response = get_http_session().get(url, timeout=30, stream=True)
             response.raise_for_status()
             
             # 从响应内容创建 PIL Image
@@ -445,7 +449,7 @@ class AIService:
         
         return prompt
     
-    def generate_image(self, prompt: str, ref_image_path: Optional[str] = None, 
+    def generate_image(self, prompt: str, ref_image_path: Optional[Union[str, Image.Image]] = None, 
                       aspect_ratio: str = "16:9", resolution: str = "2K",
                       additional_ref_images: Optional[List[Union[str, Image.Image]]] = None) -> Optional[Image.Image]:
         """
@@ -454,7 +458,7 @@ class AIService:
         
         Args:
             prompt: Image generation prompt
-            ref_image_path: Path to reference image (optional). If None, will generate based on prompt only.
+            ref_image_path: Path to reference image, or an in-memory PIL Image (optional). If None, will generate based on prompt only.
             aspect_ratio: Image aspect ratio
             resolution: Image resolution (note: OpenAI format only supports 1K)
             additional_ref_images: 额外的参考图片列表，可以是本地路径、URL 或 PIL Image 对象
@@ -475,7 +479,10 @@ class AIService:
             ref_images = []
             
             # 添加主参考图片（如果提供了路径）
-            if ref_image_path:
+            if isinstance(ref_image_path, Image.Image):
+                # 已在内存中的 PIL Image，无需落盘再读取
+                ref_images.append(ref_image_path)
+            elif ref_image_path:
                 if not os.path.exists(ref_image_path):
                     raise FileNotFoundError(f"Reference image not found: {ref_image_path}")
                 main_ref_image = Image.open(ref_image_path)
@@ -541,7 +548,7 @@ class AIService:
             logger.error(error_detail, exc_info=True)
             raise Exception(error_detail) from e
     
-    def edit_image(self, prompt: str, current_image_path: str,
+    def edit_image(self, prompt: str, current_image_path: Union[str, Image.Image],
                   aspect_ratio: str = "16:9", resolution: str = "2K",
                   original_description: str = None,
                   additional_ref_images: Optional[List[Union[str, Image.Image]]] = None) -> Optional[Image.Image]:
@@ -551,7 +558,7 @@ class AIService:
         
         Args:
             prompt: Edit instruction
-            current_image_path: Path to current page image
+            current_image_path: Path to current page image, or the image itself as a PIL Image
             aspect_ratio: Image aspect ratio
             resolution: Image resolution
             original_description: Original page description to include in prompt
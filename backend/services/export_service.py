@@ -11,14 +11,22 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from textwrap import dedent
 from dataclasses import dataclass, field
+from collections import OrderedDict
 from pptx import Presentation
 from pptx.util import Inches
 from PIL import Image
 import io
 import tempfile
 import img2pdf
+import numpy as np
 logger = logging.getLogger(__name__)
 
+# 子元素数量达到该值时，主导子元素检测改用 NumPy 向量化计算（数量少时逐个扫描开销更低）
+_DOMINANT_CHILD_VECTORIZE_MIN = 16
+
+# 一次导出中跨页复用的图片字节缓存上限（总字节数）
+_IMAGE_DATA_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 
 class ExportError(Exception):
     """
@@ -63,6 +71,42 @@ class ExportError(Exception):
         }
 
 
+class _ImageDataCache:
+    """
+    按总字节数限制大小的 LRU 图片字节缓存，用于一次导出中跨页复用的图片（logo、图标等）
+
+    超过 max_bytes 时淘汰最久未使用的条目；单个超过上限的文件不缓存。
+    """
+    def __init__(self, max_bytes: int = _IMAGE_DATA_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._entries
+
+    def get(self, path: str) -> Optional[bytes]:
+        data = self._entries.get(path)
+        if data is not None:
+            self._entries.move_to_end(path)
+        return data
+
+    def put(self, path: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(path, None)
+        if old is not None:
+            self._total_bytes -= len(old)
+        self._entries[path] = data
+        self._total_bytes += len(data)
+        while self._total_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= len(evicted)
+
+
 @dataclass
 class ExportWarnings:
     """
@@ -151,22 +195,34 @@ class ExportWarnings:
         
         return summary
     
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典（详细信息）"""
-        return {
+    def to_dict(self, max_items: Optional[int] = None) -> Dict[str, Any]:
+        """
+        转换为字典（详细信息）
+        
+        Args:
+            max_items: 每类明细最多保留的条数（保留前面的条目），None 表示不限制；
+                被截断的类别在 'truncated' 中记录省略的条数，total_warnings 始终为完整总数
+        """
+        details = {
             'style_extraction_failed': self.style_extraction_failed,
             'text_render_failed': self.text_render_failed,
             'image_add_failed': self.image_add_failed,
             'json_parse_failed': self.json_parse_failed,
             'other_warnings': self.other_warnings,
-            'total_warnings': (
-                len(self.style_extraction_failed) + 
-                len(self.text_render_failed) + 
-                len(self.image_add_failed) +
-                len(self.json_parse_failed) +
-                len(self.other_warnings)
-            )
         }
+        total = sum(len(items) for items in details.values())
+        
+        if max_items is not None:
+            truncated = {
+                key: len(items) - max_items
+                for key, items in details.items() if len(items) > max_items
+            }
+            if truncated:
+                details = {key: items[:max_items] for key, items in details.items()}
+                details['truncated'] = truncated
+        
+        details['total_warnings'] = total
+        return details
 
 
 class ExportService:
@@ -230,14 +286,14 @@ class ExportService:
         
         # Save or return bytes
         if output_file:
+            # Stream the zip straight to disk, no in-memory copy
             prs.save(output_file)
             return None
-        else:
-            # Save to bytes
-            pptx_bytes = io.BytesIO()
-            prs.save(pptx_bytes)
-            pptx_bytes.seek(0)
-            return pptx_bytes.getvalue()
+
+        # Save to bytes (single copy out of the buffer)
+        pptx_bytes = io.BytesIO()
+        prs.save(pptx_bytes)
+        return pptx_bytes.getbuffer().tobytes()
     
     @staticmethod
     def create_pdf_from_images(image_paths: List[str], output_file: str = None) -> Optional[bytes]:
@@ -338,6 +394,22 @@ class ExportService:
             pdf_bytes.seek(0)
             return pdf_bytes.getvalue()
        
+    @staticmethod
+    def _scale_mineru_bbox(bbox, scale_x: float = 1.0, scale_y: float = 1.0) -> Optional[List[int]]:
+        """
+        校验并缩放MinerU bbox（[x0, y0, x1, y1]），供各 _add_* 辅助方法共用
+        
+        Returns:
+            缩放并取整后的bbox列表；bbox无效时返回None
+        """
+        if not bbox or len(bbox) != 4:
+            return None
+        x0, y0, x1, y1 = bbox
+        scaled = [int(x0 * scale_x), int(y0 * scale_y), int(x1 * scale_x), int(y1 * scale_y)]
+        if (scale_x != 1.0 or scale_y != 1.0) and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Bbox scaled: {list(bbox)} -> {scaled} (scale: {scale_x:.3f}x{scale_y:.3f})")
+        return scaled
+    
     @staticmethod
     def _add_mineru_text_to_slide(builder, slide, text_item: Dict[str, Any], scale_x: float = 1.0, scale_y: float = 1.0):
         """
@@ -354,25 +426,11 @@ class ExportService:
         if not text:
             return
         
-        bbox = text_item.get('bbox')
-        if not bbox or len(bbox) != 4:
+        bbox = ExportService._scale_mineru_bbox(text_item.get('bbox'), scale_x, scale_y)
+        if bbox is None:
             logger.warning(f"Invalid bbox for text item: {text_item}")
             return
         
-        original_bbox = bbox.copy()
-        
-        # Apply scale factors to bbox
-        x0, y0, x1, y1 = bbox
-        bbox = [
-            int(x0 * scale_x),
-            int(y0 * scale_y),
-            int(x1 * scale_x),
-            int(y1 * scale_y)
-        ]
-        
-        if scale_x != 1.0 or scale_y != 1.0:
-            logger.debug(f"Text bbox scaled: {original_bbox} -> {bbox} (scale: {scale_x:.3f}x{scale_y:.3f})")
-        
         # Determine text level (only used for styling like bold, NOT for font size)
         # Font size is purely calculated from bbox dimensions
         item_type = text_item.get('type', 'text')
@@ -428,18 +486,11 @@ class ExportService:
                 continue
             
             # bbox_global已经是全局坐标，直接使用并应用缩放
-            x0 = bbox_global.get('x0', 0)
-            y0 = bbox_global.get('y0', 0)
-            x1 = bbox_global.get('x1', 0)
-            y1 = bbox_global.get('y1', 0)
-            
-            # 构建bbox列表 [x0, y0, x1, y1] 并应用缩放
-            bbox = [
-                int(x0 * scale_x),
-                int(y0 * scale_y),
-                int(x1 * scale_x),
-                int(y1 * scale_y)
-            ]
+            bbox = ExportService._scale_mineru_bbox(
+                (bbox_global.get('x0', 0), bbox_global.get('y0', 0),
+                 bbox_global.get('x1', 0), bbox_global.get('y1', 0)),
+                scale_x, scale_y
+            )
             
             try:
                 # 使用已有的 add_text_element 方法添加文本框（不添加边框）
@@ -478,25 +529,11 @@ class ExportService:
             scale_x: X-axis scale factor
             scale_y: Y-axis scale factor
         """
-        bbox = image_item.get('bbox')
-        if not bbox or len(bbox) != 4:
+        bbox = ExportService._scale_mineru_bbox(image_item.get('bbox'), scale_x, scale_y)
+        if bbox is None:
             logger.warning(f"Invalid bbox for image item: {image_item}")
             return
         
-        original_bbox = bbox.copy()
-        
-        # Apply scale factors to bbox
-        x0, y0, x1, y1 = bbox
-        bbox = [
-            int(x0 * scale_x),
-            int(y0 * scale_y),
-            int(x1 * scale_x),
-            int(y1 * scale_y)
-        ]
-        
-        if scale_x != 1.0 or scale_y != 1.0:
-            logger.debug(f"Item bbox scaled: {original_bbox} -> {bbox} (scale: {scale_x:.3f}x{scale_y:.3f})")
-        
         # Check if this is a table with子元素 (cells from Baidu OCR)
         item_type = image_item.get('element_type') or image_item.get('type', 'image')
         children = image_item.get('children', [])
@@ -1153,65 +1190,78 @@ class ExportService:
         builder.create_presentation()
         builder.setup_presentation_size(slide_width_pixels, slide_height_pixels)
         
-        # 5. 为每个页面构建幻灯片
-        total_pages = len(editable_images)
-        for page_idx, editable_img in enumerate(editable_images):
-            # 构建PPTX占 75% - 95% 的进度
-            percent = 75 + int(20 * page_idx / total_pages)
-            report_progress("构建PPTX", f"构建第 {page_idx + 1}/{total_pages} 页...", percent)
-            logger.info(f"  构建第 {page_idx + 1}/{total_pages} 页...")
+        # 路径存在性缓存：按目录批量 scandir 预填充，避免逐元素 stat
+        path_exists_cache: Dict[str, bool] = {}
+        ExportService._prefetch_path_exists(editable_images, path_exists_cache)
+        
+        # 元素图片字节缓存：跨页复用的图片（logo、图标等）在一次导出中只读盘一次
+        image_data_cache = _ImageDataCache()
+        
+        # 各页读取元素图片共用一个线程池，不再每页新建
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix='pptx-read') as image_read_executor:
+            # 5. 为每个页面构建幻灯片
+            total_pages = len(editable_images)
+            for page_idx, editable_img in enumerate(editable_images):
+                # 构建PPTX占 75% - 95% 的进度
+                percent = 75 + int(20 * page_idx / total_pages)
+                report_progress("构建PPTX", f"构建第 {page_idx + 1}/{total_pages} 页...", percent)
+                logger.info(f"  构建第 {page_idx + 1}/{total_pages} 页...")
             
-            # 创建空白幻灯片
-            slide = builder.add_blank_slide()
+                # 创建空白幻灯片
+                slide = builder.add_blank_slide()
             
-            # 添加背景图（参考原实现，使用slide.shapes.add_picture）
-            if editable_img.clean_background and os.path.exists(editable_img.clean_background):
-                logger.info(f"    添加clean background: {editable_img.clean_background}")
-                try:
-                    slide.shapes.add_picture(
-                        editable_img.clean_background,
-                        left=0,
-                        top=0,
-                        width=builder.prs.slide_width,
-                        height=builder.prs.slide_height
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to add background: {e}")
-            else:
-                # 回退到原图
-                logger.info(f"    使用原图作为背景: {editable_img.image_path}")
-                try:
-                    slide.shapes.add_picture(
-                        editable_img.image_path,
-                        left=0,
-                        top=0,
-                        width=builder.prs.slide_width,
-                        height=builder.prs.slide_height
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to add background: {e}")
+                # 添加背景图（参考原实现，使用slide.shapes.add_picture）
+                if editable_img.clean_background and ExportService._cached_path_exists(editable_img.clean_background, path_exists_cache):
+                    logger.info(f"    添加clean background: {editable_img.clean_background}")
+                    try:
+                        slide.shapes.add_picture(
+                            editable_img.clean_background,
+                            left=0,
+                            top=0,
+                            width=builder.prs.slide_width,
+                            height=builder.prs.slide_height
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to add background: {e}")
+                else:
+                    # 回退到原图
+                    logger.info(f"    使用原图作为背景: {editable_img.image_path}")
+                    try:
+                        slide.shapes.add_picture(
+                            editable_img.image_path,
+                            left=0,
+                            top=0,
+                            width=builder.prs.slide_width,
+                            height=builder.prs.slide_height
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to add background: {e}")
             
-            # 添加所有元素（递归地）
-            # 计算缩放比例：将原始图片坐标映射到统一的幻灯片坐标
-            # 背景图已经缩放到幻灯片尺寸，所以元素坐标也需要相应缩放
-            scale_x = slide_width_pixels / editable_img.width
-            scale_y = slide_height_pixels / editable_img.height
-            logger.info(f"    元素数量: {len(editable_img.elements)}, 图片尺寸: {editable_img.width}x{editable_img.height}, "
-                       f"幻灯片尺寸: {slide_width_pixels}x{slide_height_pixels}, 缩放比例: {scale_x:.3f}x{scale_y:.3f}")
+                # 添加所有元素（递归地）
+                # 计算缩放比例：将原始图片坐标映射到统一的幻灯片坐标
+                # 背景图已经缩放到幻灯片尺寸，所以元素坐标也需要相应缩放
+                scale_x = slide_width_pixels / editable_img.width
+                scale_y = slide_height_pixels / editable_img.height
+                logger.info(f"    元素数量: {len(editable_img.elements)}, 图片尺寸: {editable_img.width}x{editable_img.height}, "
+                           f"幻灯片尺寸: {slide_width_pixels}x{slide_height_pixels}, 缩放比例: {scale_x:.3f}x{scale_y:.3f}")
             
-            ExportService._add_editable_elements_to_slide(
-                builder=builder,
-                slide=slide,
-                elements=editable_img.elements,
-                scale_x=scale_x,
-                scale_y=scale_y,
-                depth=0,
-                text_styles_cache=text_styles_cache,  # 使用预提取的样式缓存
-                warnings=warnings,  # 收集警告
-                fail_fast=fail_fast  # 传递 fail_fast 参数
-            )
+                ExportService._add_editable_elements_to_slide(
+                    builder=builder,
+                    slide=slide,
+                    elements=editable_img.elements,
+                    scale_x=scale_x,
+                    scale_y=scale_y,
+                    depth=0,
+                    text_styles_cache=text_styles_cache,  # 使用预提取的样式缓存
+                    warnings=warnings,  # 收集警告
+                    fail_fast=fail_fast,  # 传递 fail_fast 参数
+                    path_exists_cache=path_exists_cache,
+                    image_data_cache=image_data_cache,
+                    image_read_executor=image_read_executor
+                )
             
-            logger.info(f"    ✓ 第 {page_idx + 1} 页完成，添加了 {len(editable_img.elements)} 个元素")
+                logger.info(f"    ✓ 第 {page_idx + 1} 页完成，添加了 {len(editable_img.elements)} 个元素")
         
         # 5. 保存或返回字节流
         report_progress("保存文件", "正在保存PPTX文件...", 95)
@@ -1236,6 +1286,115 @@ class ExportService:
             
             return pptx_bytes, warnings
     
+    @staticmethod
+    def _cached_path_exists(path: str, cache: Dict[str, bool]) -> bool:
+        """查询路径是否存在，结果缓存在 cache 中"""
+        exists = cache.get(path)
+        if exists is None:
+            exists = os.path.exists(path)
+            cache[path] = exists
+        return exists
+    
+    @staticmethod
+    def _prefetch_path_exists(editable_images: List, cache: Dict[str, bool]):
+        """
+        遍历所有页面的元素树，按父目录 scandir 一次，批量填充路径存在性缓存
+        
+        一次目录列举代替目录下 N 次 stat；未命中的路径由 _cached_path_exists 懒加载。
+        """
+        paths = []
+        stack = []
+        for editable_img in editable_images:
+            if editable_img.clean_background:
+                paths.append(editable_img.clean_background)
+            stack.extend(editable_img.elements)
+        while stack:
+            elem = stack.pop()
+            if elem.inpainted_background_path:
+                paths.append(elem.inpainted_background_path)
+            if elem.children:
+                stack.extend(elem.children)
+        
+        paths_by_dir: Dict[str, List[str]] = {}
+        for path in paths:
+            paths_by_dir.setdefault(os.path.dirname(path), []).append(path)
+        
+        for directory, dir_paths in paths_by_dir.items():
+            try:
+                with os.scandir(directory or '.') as it:
+                    names = {entry.name for entry in it}
+            except OSError:
+                names = set()
+            for path in dir_paths:
+                cache[path] = os.path.basename(path) in names
+    
+    @staticmethod
+    def _find_dominant_child(children: List, parent_bbox, threshold: float) -> Tuple[int, float]:
+        """
+        查找首个面积占比超过阈值的子元素
+        
+        子元素由父元素区域裁剪分析得到，高度通常不超过父元素，因此先用
+        宽度 × max(父元素高度, 子元素高度) 作为面积上界（子元素比父元素高时上界即真实面积）：
+        上界未超过阈值的子元素直接排除，只对剩余候选计算真实面积。子元素较少时直接逐个扫描（首个命中即返回），
+        较多时使用 NumPy 向量化计算。
+        
+        Args:
+            children: 子元素列表（EditableElement），优先使用 bbox_global
+            parent_bbox: 父元素 BBox
+            threshold: 覆盖率阈值
+        
+        Returns:
+            (index, coverage_ratio)：不存在时返回 (-1, 0.0)
+        """
+        parent_h = parent_bbox.y1 - parent_bbox.y0
+        parent_area = (parent_bbox.x1 - parent_bbox.x0) * parent_h
+        if not children or parent_area <= 0:
+            return -1, 0.0
+        threshold_area = threshold * parent_area
+        
+        boxes = [
+            (getattr(child, 'bbox_global', None) or child.bbox).to_tuple()
+            for child in children
+        ]
+        if len(boxes) < _DOMINANT_CHILD_VECTORIZE_MIN:
+            idx, area = ExportService._dominant_child_index(boxes, parent_h, threshold_area)
+        else:
+            idx, area = ExportService._dominant_child_index_vectorized(
+                np.asarray(boxes, dtype=np.float64), parent_h, threshold_area
+            )
+        if idx < 0:
+            return -1, 0.0
+        return idx, area / parent_area
+    
+    @staticmethod
+    def _dominant_child_index(boxes: List[Tuple[float, float, float, float]], parent_h: float, threshold_area: float) -> Tuple[int, float]:
+        """逐个扫描 (x0, y0, x1, y1)，返回首个面积超过 threshold_area 的下标及其面积"""
+        for i, (x0, y0, x1, y1) in enumerate(boxes):
+            width = x1 - x0
+            height = y1 - y0
+            if width * max(parent_h, height) <= threshold_area:
+                continue
+            area = width * height
+            if area > threshold_area:
+                return i, area
+        return -1, 0.0
+    
+    @staticmethod
+    def _dominant_child_index_vectorized(bboxes: np.ndarray, parent_h: float, threshold_area: float) -> Tuple[int, float]:
+        """_dominant_child_index 的 NumPy 版本，bboxes 形状为 (N, 4)"""
+        widths = bboxes[:, 2] - bboxes[:, 0]
+        heights = bboxes[:, 3] - bboxes[:, 1]
+        candidates = np.flatnonzero(widths * np.maximum(heights, parent_h) > threshold_area)
+        if candidates.size == 0:
+            return -1, 0.0
+        
+        areas = widths[candidates] * heights[candidates]
+        dominant = areas > threshold_area
+        if not dominant.any():
+            return -1, 0.0
+        pos = int(np.argmax(dominant))
+        return int(candidates[pos]), float(areas[pos])
+    
     @staticmethod
     def _add_editable_elements_to_slide(
         builder,
@@ -1246,10 +1405,19 @@ class ExportService:
         depth: int = 0,
         text_styles_cache: Dict[str, Any] = None,  # 预提取的文本样式缓存，key为element_id
         warnings: 'ExportWarnings' = None,  # 警告收集器
-        fail_fast: bool = False  # 是否在遇到错误时立即停止
+        fail_fast: bool = False,  # 是否在遇到错误时立即停止
+        path_exists_cache: Dict[str, bool] = None,  # 路径存在性缓存，key为文件路径
+        image_data_cache: _ImageDataCache = None,  # 跨页图片字节缓存，key为文件路径
+        image_read_executor=None  # 读取图片文件的线程池，由调用方在整个导出中复用
     ):
         """
-        递归地将EditableElement添加到幻灯片
+        将EditableElement（含子元素）添加到幻灯片
+        
+        使用显式栈做深度优先遍历（替代递归），添加顺序与递归版本一致：
+        父元素背景先于其子元素，子元素先于父元素的下一个兄弟元素。
+        
+        分三步执行：先遍历元素树生成添加操作列表，再并发读取本页所需的图片文件，
+        最后按顺序执行添加操作（python-pptx 的写入仍是串行的）。
         
         Args:
             builder: PPTXBuilder实例
@@ -1257,17 +1425,33 @@ class ExportService:
             elements: EditableElement列表
             scale_x: X轴缩放因子
             scale_y: Y轴缩放因子
-            depth: 当前递归深度
+            depth: elements 所在的层级深度
             text_styles_cache: 预提取的文本样式缓存（可选），由 _batch_extract_text_styles 生成
+            path_exists_cache: 路径存在性缓存（可选），由 _prefetch_path_exists 预填充
+            image_data_cache: 图片字节缓存（可选），在同一次导出的各页之间共享
+            image_read_executor: 读取图片文件的线程池（可选），不提供时串行读取
         
         Note:
             elem.image_path 现在是绝对路径，无需额外的目录参数
         """
         if text_styles_cache is None:
             text_styles_cache = {}
-        
-        for elem in elements:
+        if path_exists_cache is None:
+            path_exists_cache = {}
+        if image_data_cache is None:
+            image_data_cache = _ImageDataCache()
+        
+        # 第一步：生成添加操作 (kind, payload, bbox_list, error_info)
+        ops = []
+        # DEBUG 关闭时跳过调试日志的字符串拼接（每次调用判断一次）
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
+        # 栈元素为 (element, depth)，逆序压栈以保持原有遍历顺序
+        stack = [(elem, depth) for elem in reversed(elements)]
+        while stack:
+            elem, depth = stack.pop()
             elem_type = elem.element_type
+            indent = '  ' * depth
             
             # 根据深度决定使用局部坐标还是全局坐标
             # depth=0: 顶层元素，使用局部坐标（bbox）
@@ -1275,7 +1459,7 @@ class ExportService:
             if depth == 0:
                 bbox = elem.bbox  # 顶层元素使用局部坐标
             else:
-                bbox = elem.bbox_global if hasattr(elem, 'bbox_global') and elem.bbox_global else elem.bbox
+                bbox = getattr(elem, 'bbox_global', None) or elem.bbox
             
             # 转换BBox对象为列表并应用缩放
             bbox_list = [
@@ -1285,7 +1469,7 @@ class ExportService:
                 int(bbox.y1 * scale_y)
             ]
             
-            logger.info(f"{'  ' * depth}  添加元素: type={elem_type}, bbox={bbox_list}, content={elem.content[:30] if elem.content else None}, image_path={elem.image_path}, 使用{'全局' if depth > 0 else '局部'}坐标")
+            logger.info(f"{indent}  添加元素: type={elem_type}, bbox={bbox_list}, content={elem.content[:30] if elem.content else None}, image_path={elem.image_path}, 使用{'全局' if depth > 0 else '局部'}坐标")
             
             # 根据类型添加元素（参考原实现的_add_mineru_text_to_slide和_add_mineru_image_to_slide）
             if elem_type in ['text', 'title', 'list', 'paragraph', 'header', 'footer', 'heading', 'table_caption', 'image_caption']:
@@ -1293,107 +1477,58 @@ class ExportService:
                 if elem.content:
                     text = elem.content.strip()
                     if text:
-                        try:
-                            # 确定文本级别
-                            level = 'title' if elem_type in ['title', 'heading'] else 'default'
-                            
-                            # 从缓存获取预提取的文字样式
-                            text_style = text_styles_cache.get(elem.element_id)
-                            if text_style:
-                                logger.debug(f"{'  ' * depth}  使用缓存的文字样式: color={text_style.font_color_rgb}, bold={text_style.is_bold}")
-                            
-                            builder.add_text_element(
-                                slide=slide,
-                                text=text,
-                                bbox=bbox_list,
-                                text_level=level,
-                                text_style=text_style
-                            )
-                        except Exception as e:
-                            logger.warning(f"添加文本元素失败: {e}")
-                            if fail_fast:
-                                raise ExportError(
-                                    message=f"添加文本元素失败: {str(e)}",
-                                    error_type='text_render',
-                                    details={'text': text[:50], 'bbox': bbox_list}
-                                )
-                            if warnings:
-                                warnings.add_text_render_failed(text, str(e))
+                        # 确定文本级别
+                        level = 'title' if elem_type in ['title', 'heading'] else 'default'
+                        
+                        # 从缓存获取预提取的文字样式
+                        text_style = text_styles_cache.get(elem.element_id)
+                        if text_style and debug_enabled:
+                            logger.debug(f"{indent}  使用缓存的文字样式: color={text_style.font_color_rgb}, bold={text_style.is_bold}")
+                        
+                        ops.append((
+                            'text',
+                            {'text': text, 'text_level': level, 'text_style': text_style},
+                            bbox_list,
+                            ('添加文本元素失败', '添加文本元素失败')
+                        ))
             
             elif elem_type == 'table_cell':
                 # 添加表格单元格（带边框的文本框）
                 if elem.content:
                     text = elem.content.strip()
                     if text:
-                        try:
-                            # 从缓存获取预提取的文字样式
-                            text_style = text_styles_cache.get(elem.element_id)
-                            
-                            # 表格单元格已经在上面统一处理了bbox_global和缩放
-                            # 直接使用bbox_list即可
-                            builder.add_text_element(
-                                slide=slide,
-                                text=text,
-                                bbox=bbox_list,
-                                text_level=None,
-                                align='center',
-                                text_style=text_style
-                            )
-
-                        except Exception as e:
-                            logger.warning(f"添加单元格失败: {e}")
-                            if fail_fast:
-                                raise ExportError(
-                                    message=f"添加表格单元格失败: {str(e)}",
-                                    error_type='text_render',
-                                    details={'text': text[:50], 'bbox': bbox_list}
-                                )
-                            if warnings:
-                                warnings.add_text_render_failed(text, str(e))
+                        # 从缓存获取预提取的文字样式
+                        text_style = text_styles_cache.get(elem.element_id)
+                        
+                        # 表格单元格已经在上面统一处理了bbox_global和缩放
+                        # 直接使用bbox_list即可
+                        ops.append((
+                            'text',
+                            {'text': text, 'text_level': None, 'align': 'center', 'text_style': text_style},
+                            bbox_list,
+                            ('添加单元格失败', '添加表格单元格失败')
+                        ))
             
             elif elem_type == 'table':
                 # 如果表格有子元素（单元格），使用inpainted背景 + 单元格
                 if elem.children and elem.inpainted_background_path:
-                    logger.info(f"{'  ' * depth}    表格有 {len(elem.children)} 个单元格，使用可编辑格式")
+                    logger.info(f"{indent}    表格有 {len(elem.children)} 个单元格，使用可编辑格式")
                     
                     # 先添加inpainted背景（干净的表格框架）
-                    if os.path.exists(elem.inpainted_background_path):
-                        try:
-                            builder.add_image_element(
-                                slide=slide,
-                                image_path=elem.inpainted_background_path,
-                                bbox=bbox_list
-                            )
-                        except Exception as e:
-                            logger.error(f"Failed to add table background: {e}")
+                    if ExportService._cached_path_exists(elem.inpainted_background_path, path_exists_cache):
+                        ops.append(('image', elem.inpainted_background_path, bbox_list, ('Failed to add table background', None)))
                     
-                    # 递归添加单元格
-                    ExportService._add_editable_elements_to_slide(
-                        builder=builder,
-                        slide=slide,
-                        elements=elem.children,
-                        scale_x=scale_x,
-                        scale_y=scale_y,
-                        depth=depth + 1,
-                        text_styles_cache=text_styles_cache,
-                        warnings=warnings,
-                        fail_fast=fail_fast
-                    )
+                    # 单元格入栈，紧接着处理
+                    stack.extend((child, depth + 1) for child in reversed(elem.children))
                 else:
                     # 没有子元素，添加整体表格图片
                     # elem.image_path 现在是绝对路径
-                    if elem.image_path and os.path.exists(elem.image_path):
-                        try:
-                            builder.add_image_element(
-                                slide=slide,
-                                image_path=elem.image_path,
-                                bbox=bbox_list
-                            )
-                        except Exception as e:
-                            logger.error(f"Failed to add table image: {e}")
+                    # 不预先检查文件是否存在：读取时若不存在再回退为占位符
+                    if elem.image_path:
+                        ops.append(('image', elem.image_path, bbox_list, ('Failed to add table image', 'Table image not found')))
                     else:
                         logger.warning(f"Table image not found: {elem.image_path}")
-                        builder.add_image_placeholder(slide, bbox_list)
+                        ops.append(('placeholder', None, bbox_list, None))
             
             elif elem_type in ['image', 'figure', 'chart']:
                 # 检查是否应该使用递归渲染
@@ -1401,67 +1536,126 @@ class ExportService:
                 
                 if elem.children and elem.inpainted_background_path:
                     # 检查是否有任意子元素占据父元素绝大部分面积
-                    parent_area = (bbox.x1 - bbox.x0) * (bbox.y1 - bbox.y0)
                     max_child_coverage_ratio = 0.85  # 阈值
-                    has_dominant_child = False
-                    
-                    for child in elem.children:
-                        if hasattr(child, 'bbox_global') and child.bbox_global:
-                            child_bbox = child.bbox_global
-                        else:
-                            child_bbox = child.bbox
-                        
-                        child_area = child_bbox.area
-                        coverage_ratio = child_area / parent_area if parent_area > 0 else 0
-                        
-                        if coverage_ratio > max_child_coverage_ratio:
-                            logger.info(f"{'  ' * depth}    子元素 {child.element_id} 占父元素面积 {coverage_ratio*100:.1f}% (>{max_child_coverage_ratio*100:.0f}%)，跳过递归渲染，直接使用原图")
-                            has_dominant_child = True
-                            break
+                    dominant_idx, coverage_ratio = ExportService._find_dominant_child(
+                        elem.children, bbox, max_child_coverage_ratio
+                    )
+                    has_dominant_child = dominant_idx >= 0
+                    if has_dominant_child:
+                        child = elem.children[dominant_idx]
+                        logger.info(f"{indent}    子元素 {child.element_id} 占父元素面积 {coverage_ratio*100:.1f}% (>{max_child_coverage_ratio*100:.0f}%)，跳过递归渲染，直接使用原图")
                     
                     should_use_recursive_render = not has_dominant_child
                 
                 # 如果有子元素且应该递归渲染
                 if should_use_recursive_render:
-                    logger.debug(f"{'  ' * depth}    元素有 {len(elem.children)} 个子元素，递归添加")
+                    if debug_enabled:
+                        logger.debug(f"{indent}    元素有 {len(elem.children)} 个子元素，递归添加")
                     
                     # 先添加inpainted背景
-                    if os.path.exists(elem.inpainted_background_path):
-                        try:
-                            builder.add_image_element(slide, elem.inpainted_background_path, bbox_list)
-                        except Exception as e:
-                            logger.error(f"Failed to add inpainted background: {e}")
+                    if ExportService._cached_path_exists(elem.inpainted_background_path, path_exists_cache):
+                        ops.append(('image', elem.inpainted_background_path, bbox_list, ('Failed to add inpainted background', None)))
                     
-                    # 递归添加子元素
-                    ExportService._add_editable_elements_to_slide(
-                        builder=builder,
-                        slide=slide,
-                        elements=elem.children,
-                        scale_x=scale_x,
-                        scale_y=scale_y,
-                        depth=depth + 1,
-                        text_styles_cache=text_styles_cache,
-                        warnings=warnings,
-                        fail_fast=fail_fast
-                    )
+                    # 子元素入栈，紧接着处理
+                    stack.extend((child, depth + 1) for child in reversed(elem.children))
                 else:
                     # 没有子元素或子元素占比过大，直接添加原图
                     # elem.image_path 现在是绝对路径
-                    if elem.image_path and os.path.exists(elem.image_path):
-                        try:
-                            builder.add_image_element(
-                                slide=slide,
-                                image_path=elem.image_path,
-                                bbox=bbox_list
-                            )
-                        except Exception as e:
-                            logger.error(f"Failed to add image: {e}")
+                    # 不预先检查文件是否存在：读取时若不存在再回退为占位符
+                    if elem.image_path:
+                        ops.append(('image', elem.image_path, bbox_list, ('Failed to add image', 'Image file not found')))
                     else:
                         logger.warning(f"Image file not found: {elem.image_path}")
-                        builder.add_image_placeholder(slide, bbox_list)
+                        ops.append(('placeholder', None, bbox_list, None))
             
             else:
                 # 其他类型
-                logger.debug(f"{'  ' * depth}  跳过未知类型: {elem_type}")
+                if debug_enabled:
+                    logger.debug(f"{indent}  跳过未知类型: {elem_type}")
+        
+        # 第二步：并发读取本页用到的图片文件（磁盘 I/O 释放 GIL）
+        image_data = ExportService._read_image_files(
+            {payload for kind, payload, _, _ in ops if kind == 'image'},
+            image_data_cache,
+            image_read_executor
+        )
+        
+        # 第三步：按遍历顺序执行添加操作
+        for kind, payload, bbox_list, error_info in ops:
+            if kind == 'text':
+                log_prefix, error_prefix = error_info
+                try:
+                    builder.add_text_element(slide=slide, bbox=bbox_list, **payload)
+                except Exception as e:
+                    text = payload['text']
+                    logger.warning(f"{log_prefix}: {e}")
+                    if fail_fast:
+                        raise ExportError(
+                            message=f"{error_prefix}: {str(e)}",
+                            error_type='text_render',
+                            details={'text': text[:50], 'bbox': bbox_list}
+                        )
+                    if warnings:
+                        warnings.add_text_render_failed(text, str(e))
+            elif kind == 'image':
+                error_label, missing_label = error_info
+                data = image_data.get(payload)
+                if data is None and missing_label:
+                    logger.warning(f"{missing_label}: {payload}")
+                    builder.add_image_placeholder(slide, bbox_list)
+                    continue
+                try:
+                    builder.add_image_element(
+                        slide=slide,
+                        image_path=payload,
+                        bbox=bbox_list,
+                        image_data=data
+                    )
+                except Exception as e:
+                    logger.error(f"{error_label}: {e}")
+            else:
+                builder.add_image_placeholder(slide, bbox_list)
     
-
+    @staticmethod
+    def _read_image_files(paths, cache: _ImageDataCache = None, executor=None) -> Dict[str, bytes]:
+        """
+        并发读取图片文件内容，不存在或读取失败的路径不出现在结果中（由调用方处理）
+        
+        Args:
+            paths: 图片路径集合
+            cache: 跨调用共享的字节缓存（可选）；命中的路径不再读盘，新读取的内容写入缓存，
+                缓存按总字节数限制大小，淘汰最久未使用的条目
+            executor: 并发读取使用的线程池（可选），不提供时串行读取
+        """
+        if cache is None:
+            cache = _ImageDataCache()
+        found = {}
+        for path in paths:
+            data = cache.get(path)
+            if data is not None:
+                found[path] = data
+        paths = [path for path in paths if path not in found]
+        if not paths:
+            return found
+        
+        def read_file(path):
+            try:
+                with open(path, 'rb') as f:
+                    return path, f.read()
+            except FileNotFoundError:
+                return path, None
+            except OSError as e:
+                logger.warning(f"读取图片失败: {path}: {e}")
+                return path, None
+        
+        if executor is None or len(paths) == 1:
+            results = [read_file(path) for path in paths]
+        else:
+            results = list(executor.map(read_file, paths))
+        
+        for path, data in results:
+            if data is None:
+                continue
+            found[path] = data
+            cache.put(path, data)
+        return found
@@ -13,9 +13,11 @@ import tempfile
 from typing import Optional, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from PIL import Image
+from flask import current_app, has_app_context
 from markitdown import MarkItDown
 from services.ai_providers.lazyllm_env import ensure_lazyllm_namespace_key, get_lazyllm_api_key
 from services.ai_providers.text import strip_think_tags
+from utils.http_utils import get_http_session
 
 logger = logging.getLogger(__name__)
 
@@ -36,18 +38,13 @@ def _get_ai_provider_format(provider_format: str = None) -> str:
         return provider_format.lower()
     
     # Try to get from Flask app config first (database settings)
-    try:
-        from flask import current_app
-        if current_app and hasattr(current_app, 'config'):
-            config_value = current_app.config.get('AI_PROVIDER_FORMAT')
-            if config_value:
-                return str(config_value).lower()
-    except RuntimeError:
-        # Not in Flask application context
-        pass
+    if has_app_context():
+        config_value = current_app.config.get('AI_PROVIDER_FORMAT')
+        if config_value:
+            return str(config_value).lower()
     
     # Fallback to environment variable
-    return os.getenv('AI_PROVIDER_FORMAT', 'gemini').lower()
+    return os.environ.get('AI_PROVIDER_FORMAT', 'gemini').lower()
 
 
 class FileParserService:
@@ -142,13 +139,16 @@ class FileParserService:
         else:
             return bool(self._google_api_key)
     
-    def parse_file(self, file_path: str, filename: str) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str], int]:
+    def parse_file(self, file_path: str, filename: str,
+                   include_header_footer: bool = False) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str], int]:
         """
         Parse a file using MinerU service and enhance with image captions
         
         Args:
             file_path: Path to the file to parse
             filename: Original filename
+            include_header_footer: Prepend the header/footer text MinerU discarded
+                from the markdown (read from layout.json in the same result zip)
             
         Returns:
             Tuple of (batch_id, markdown_content, extract_id, error_message, failed_image_count)
@@ -192,7 +192,9 @@ class FileParserService:
             
             # Step 3: Poll for parsing result
             logger.info("Step 3/4: Waiting for parsing to complete...")
-            markdown_content, extract_id, error = self._poll_result(batch_id)
+            markdown_content, extract_id, error = self._poll_result(
+                batch_id, include_header_footer=include_header_footer
+            )
             if error:
                 return batch_id, None, None, error, 0
             
@@ -216,6 +218,19 @@ class FileParserService:
             logger.error(error_msg, exc_info=True)
             return None, None, None, error_msg, 0
     
+    def parse_file_with_header_footer(self, file_path: str, filename: str) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str], int]:
+        """
+        Parse a file like parse_file, with the header/footer text that MinerU
+        discarded from the markdown prepended.
+        
+        The header/footer text is taken from layout.json while the result zip
+        is being unpacked, so no second read of the extracted files is needed.
+        
+        Returns:
+            Same tuple as parse_file, with markdown_content including header/footer text
+        """
+        return self.parse_file(file_path, filename, include_header_footer=True)
+    
     def _parse_text_file(self, file_path: str, filename: str) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str], int]:
         """
         Parse plain text file directly without MinerU
@@ -314,7 +329,7 @@ class FileParserService:
         }
         
         try:
-            response = requests.post(
+            response = get_http_session().post(
                 self.get_upload_url_api,
                 headers=headers,
                 json=upload_data,
@@ -341,7 +356,7 @@ class FileParserService:
         """Upload file to MinerU"""
         try:
             with open(file_path, 'rb') as f:
-                response = requests.put(
+                response = get_http_session().put(
                     upload_url,
                     data=f,
                     headers={"Authorization": None},  # Remove auth for upload
@@ -359,7 +374,8 @@ class FileParserService:
             logger.error(error_msg)
             return error_msg
     
-    def _poll_result(self, batch_id: str, max_wait_time: int = 600) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    def _poll_result(self, batch_id: str, max_wait_time: int = 600,
+                     include_header_footer: bool = False) -> tuple[Optional[str], Optional[str], Optional[str]]:
         """Poll for parsing result
         
         Returns:
@@ -380,7 +396,7 @@ class FileParserService:
                 return None, None, error_msg
             
             try:
-                response = requests.get(result_url, headers=headers, timeout=30)
+                response = get_http_session().get(result_url, headers=headers, timeout=30)
                 response.raise_for_status()
                 task_info = response.json()
                 
@@ -395,7 +411,7 @@ class FileParserService:
                     logger.info("File parsing completed!")
                     full_zip_url = task_info["data"]["extract_result"][0]["full_zip_url"]
                     # Download and extract markdown
-                    return self._download_markdown(full_zip_url)
+                    return self._download_markdown(full_zip_url, include_header_footer)
                 elif task_status == "failed":
                     err_msg = task_info["data"]["extract_result"][0].get("err_msg", "Unknown error")
                     error_msg = f"File parsing failed: {err_msg}"
@@ -409,14 +425,18 @@ class FileParserService:
                 logger.warning(f"Network error while polling result: {str(e)}, retrying...")
                 time.sleep(2)
     
-    def _download_markdown(self, zip_url: str) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    def _download_markdown(self, zip_url: str,
+                           include_header_footer: bool = False) -> tuple[Optional[str], Optional[str], Optional[str]]:
         """Download and extract markdown from result zip, save images to local server
         
+        When include_header_footer is set, the header/footer text from the zip's
+        layout.json is prepended to the markdown.
+        
         Returns:
             Tuple of (markdown_content, extract_id, error_message)
         """
         try:
-            response = requests.get(zip_url, timeout=60)
+            response = get_http_session().get(zip_url, timeout=60)
             response.raise_for_status()
             
             # Generate unique directory name for this extraction
@@ -461,6 +481,12 @@ class FileParserService:
                     error_msg = "No markdown file found in result zip"
                     logger.error(error_msg)
                     return None, None, error_msg
+                
+                # 页眉页脚直接从内存中的 zip 读取 layout.json，无需再从解压目录读一遍
+                if include_header_footer and 'layout.json' in z.namelist():
+                    hf_text = self._header_footer_from_layout_bytes(z.read('layout.json'))
+                    if hf_text:
+                        markdown_content = hf_text + '\n\n' + markdown_content
             
             # Replace relative image paths with local server URLs
             markdown_content = self._replace_image_paths(
@@ -495,7 +521,6 @@ class FileParserService:
         Returns:
             提取到的页眉页脚文本，如无则返回空字符串
         """
-        import json
         from pathlib import Path
 
         current_file = Path(__file__).resolve()
@@ -506,9 +531,15 @@ class FileParserService:
         if not layout_file.exists():
             return ''
 
+        return FileParserService._header_footer_from_layout_bytes(layout_file.read_bytes())
+
+    @staticmethod
+    def _header_footer_from_layout_bytes(layout_bytes: bytes) -> str:
+        """从 layout.json 的内容中提取页眉页脚文本，解析失败时返回空字符串"""
+        import json
+
         try:
-            with open(layout_file, 'r', encoding='utf-8') as f:
-                layout_data = json.load(f)
+            layout_data = json.loads(layout_bytes)
 
             if 'pdf_info' not in layout_data or not layout_data['pdf_info']:
                 return ''
@@ -625,14 +656,18 @@ class FileParserService:
         success_count = len(images_to_caption) - failed_count
         logger.info(f"Image caption generation completed: {success_count} succeeded, {failed_count} failed out of {len(images_to_caption)} total")
         
-        # Replace image syntax with captioned version (in reverse order to maintain positions)
-        enhanced_content = markdown_content
-        for match, caption in zip(reversed(images_to_caption), reversed(captions)):
-            old_text = match.group(0)
+        # Replace image syntax with captioned version in a single pass over the content
+        # (building pieces and joining once, instead of re-slicing the whole string per image)
+        pieces = []
+        last_end = 0
+        for match, caption in zip(images_to_caption, captions):
             url = match.group(2)
+            pieces.append(markdown_content[last_end:match.start()])
             # Use caption as alt text (empty if generation failed)
-            new_text = f"![{caption}]({url})"
-            enhanced_content = enhanced_content[:match.start()] + new_text + enhanced_content[match.end():]
+            pieces.append(f"![{caption}]({url})")
+            last_end = match.end()
+        pieces.append(markdown_content[last_end:])
+        enhanced_content = ''.join(pieces)
         
         return enhanced_content, failed_count
     
@@ -704,7 +739,7 @@ class FileParserService:
             # Load image based on URL type
             if image_url.startswith('http://') or image_url.startswith('https://'):
                 # Download from HTTP(S) URL
-                response = requests.get(image_url, timeout=30)
+                response = get_http_session().get(image_url, timeout=30)
                 response.raise_for_status()
                 image = Image.open(io.BytesIO(response.content))
             elif image_url.startswith('/files/mineru/'):
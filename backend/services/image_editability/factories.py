@@ -2,7 +2,7 @@
 工厂类 - 负责创建和配置具体的提取器和Inpaint提供者
 """
 import logging
-from typing import List, Optional, Any
+from typing import List, Dict, Optional, Any
 from pathlib import Path
 
 from .extractors import ElementExtractor, MinerUElementExtractor, BaiduOCRElementExtractor, BaiduAccurateOCRElementExtractor, ExtractorRegistry
@@ -464,7 +464,8 @@ class ServiceConfig:
         inpaint_registry: InpaintProviderRegistry,
         max_depth: int = 1,
         min_image_size: int = 200,
-        min_image_area: int = 40000
+        min_image_area: int = 40000,
+        inpaint_options: Optional[Dict[str, Any]] = None
     ):
         """
         初始化服务配置
@@ -476,6 +477,7 @@ class ServiceConfig:
             max_depth: 最大递归深度（默认1）
             min_image_size: 最小图片尺寸
             min_image_area: 最小图片面积
+            inpaint_options: 透传给 inpaint_regions 的额外参数（如 tiled/tile_size/tile_overlap）
         """
         self.upload_folder = upload_folder
         self.extractor_registry = extractor_registry
@@ -483,6 +485,7 @@ class ServiceConfig:
         self.max_depth = max_depth
         self.min_image_size = min_image_size
         self.min_image_area = min_image_area
+        self.inpaint_options = dict(inpaint_options or {})
     
     @classmethod
     def from_defaults(
@@ -534,6 +537,9 @@ class ServiceConfig:
                 - contain_threshold: 混合提取器包含判断阈值（默认0.8）
                 - intersection_threshold: 混合提取器交集判断阈值（默认0.3）
                 - enhance_quality: 混合Inpaint是否启用画质提升（默认True）
+                - inpaint_tiled: 生成式重绘是否分块处理大图（默认从 Flask config 获取，否则False）
+                - inpaint_tile_size: 分块边长（默认从 Flask config 获取，否则1024）
+                - inpaint_tile_overlap: 分块重叠宽度（默认从 Flask config 获取，否则128）
         
         Returns:
             ServiceConfig实例
@@ -555,6 +561,9 @@ class ServiceConfig:
                 mineru_api_base = current_app.config.get('MINERU_API_BASE', 'https://mineru.net')
             if upload_folder is None:
                 upload_folder = current_app.config.get('UPLOAD_FOLDER', './uploads')
+            kwargs.setdefault('inpaint_tiled', current_app.config.get('GENERATIVE_INPAINT_TILED', False))
+            kwargs.setdefault('inpaint_tile_size', current_app.config.get('GENERATIVE_INPAINT_TILE_SIZE', 1024))
+            kwargs.setdefault('inpaint_tile_overlap', current_app.config.get('GENERATIVE_INPAINT_TILE_OVERLAP', 128))
         else:
             # 回退到默认值
             if mineru_api_base is None:
@@ -668,7 +677,12 @@ class ServiceConfig:
             inpaint_registry=inpaint_registry,
             max_depth=kwargs.get('max_depth', 1),
             min_image_size=kwargs.get('min_image_size', 200),
-            min_image_area=kwargs.get('min_image_area', 40000)
+            min_image_area=kwargs.get('min_image_area', 40000),
+            inpaint_options={
+                'tiled': kwargs.get('inpaint_tiled', False),
+                'tile_size': kwargs.get('inpaint_tile_size', 1024),
+                'tile_overlap': kwargs.get('inpaint_tile_overlap', 128),
+            }
         )
 
 
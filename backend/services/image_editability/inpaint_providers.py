@@ -10,13 +10,19 @@ Inpaint提供者 - 抽象不同的inpaint实现
 以及注册表：
 - InpaintProviderRegistry - 元素类型到重绘方法的映射注册表
 """
+import hashlib
 import logging
-import tempfile
+import threading
+import types
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict
+from collections import OrderedDict
+from typing import List, Optional, Mapping
 from PIL import Image
+import numpy as np
 
+from services.prompts import get_clean_background_prompt, get_quality_enhancement_prompt
 from utils.mask_utils import create_mask_from_bboxes
+from utils.ai_pool import run_in_ai_pool
 
 logger = logging.getLogger(__name__)
 
@@ -130,8 +136,16 @@ class GenerativeEditInpaintProvider(InpaintProvider):
     - bbox不够精确时
     - 需要移除复杂或分散的元素时
     - 作为mask-based方法的备选方案
+    
+    结果按图片内容缓存（LRU），同一实例对内容相同的图片（如重复的模板页）只调用一次模型。
     """
     
+    # 结果缓存的最大条目数
+    CACHE_MAX_ENTRIES = 32
+    
+    # 分块重绘时单张图片同时在共享 AI 线程池中的最大分块数
+    TILE_MAX_IN_FLIGHT = 8
+    
     def __init__(self, ai_service, aspect_ratio: str = "16:9", resolution: str = "2K"):
         """
         初始化生成式编辑Inpaint提供者
@@ -144,6 +158,24 @@ class GenerativeEditInpaintProvider(InpaintProvider):
         self.ai_service = ai_service
         self.aspect_ratio = aspect_ratio
         self.resolution = resolution
+        self._edit_instruction: Optional[str] = None
+        self._cache: 'OrderedDict[bytes, Image.Image]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+    
+    @property
+    def edit_instruction(self) -> str:
+        """清理背景的prompt（固定内容，首次使用时生成并缓存）"""
+        if self._edit_instruction is None:
+            self._edit_instruction = get_clean_background_prompt()
+        return self._edit_instruction
+    
+    def _cache_key(self, image: Image.Image, aspect_ratio: str, resolution: str) -> bytes:
+        """按图片内容和生成配置计算缓存key"""
+        hasher = hashlib.blake2b(digest_size=16, usedforsecurity=False)
+        hasher.update(f"{image.mode}|{image.size}|{aspect_ratio}|{resolution}|{self.edit_instruction}".encode('utf-8'))
+        hasher.update(image.tobytes())
+        return hasher.digest()
     
     def inpaint_regions(
         self,
@@ -160,45 +192,43 @@ class GenerativeEditInpaintProvider(InpaintProvider):
         支持的kwargs参数：
         - aspect_ratio: str, 宽高比，默认使用初始化时的值
         - resolution: str, 分辨率，默认使用初始化时的值
+        - tiled: bool, 是否对大图分块重绘后拼接，默认False
+        - tile_size: int, 分块边长（像素），默认1024；图片不大于该尺寸时仍整图处理
+        - tile_overlap: int, 相邻分块的重叠宽度（像素），默认128
         """
         aspect_ratio = kwargs.get('aspect_ratio', self.aspect_ratio)
         resolution = kwargs.get('resolution', self.resolution)
+        tiled = kwargs.get('tiled', False)
+        tile_size = kwargs.get('tile_size', 1024)
+        tile_overlap = kwargs.get('tile_overlap', 128)
+        use_tiles = tiled and max(image.size) > tile_size
         
         try:
-            from services.prompts import get_clean_background_prompt
-            
-            # 获取清理背景的prompt
-            edit_instruction = get_clean_background_prompt()
-            
-            # 保存临时图片文件（AI服务需要文件路径）
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                tmp_path = tmp_file.name
-                image.save(tmp_path)
+            cache_key = self._cache_key(
+                image, aspect_ratio, f"{resolution}|tiles={tile_size},{tile_overlap}" if use_tiles else resolution
+            )
+            with self._cache_lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    self.cache_hits += 1
+            if cached is not None:
+                logger.info(f"GenerativeEditInpaintProvider: 命中缓存，跳过模型调用（累计命中 {self.cache_hits} 次）")
+                return cached.copy()
             
             logger.info("GenerativeEditInpaintProvider: 开始生成式编辑重绘...")
             
-            # 调用AI服务编辑图片
-            clean_bg_image = self.ai_service.edit_image(
-                prompt=edit_instruction,
-                current_image_path=tmp_path,
-                aspect_ratio=aspect_ratio,
-                resolution=resolution,
-                original_description=None,
-                additional_ref_images=None
-            )
-            
-            if not clean_bg_image:
-                logger.error("GenerativeEditInpaintProvider: 生成式编辑返回空结果")
+            if use_tiles:
+                clean_bg_image = self._tile_and_inpaint(image, resolution, tile_size, tile_overlap)
+            else:
+                clean_bg_image = self._edit(image, aspect_ratio, resolution)
+            if clean_bg_image is None:
                 return None
             
-            # 转换为PIL Image
-            if not isinstance(clean_bg_image, Image.Image):
-                # Google GenAI返回自己的Image类型，需要提取_pil_image
-                if hasattr(clean_bg_image, '_pil_image'):
-                    clean_bg_image = clean_bg_image._pil_image
-                else:
-                    logger.error(f"GenerativeEditInpaintProvider: 未知的图片类型: {type(clean_bg_image)}")
-                    return None
+            with self._cache_lock:
+                self._cache[cache_key] = clean_bg_image.copy()
+                if len(self._cache) > self.CACHE_MAX_ENTRIES:
+                    self._cache.popitem(last=False)
             
             logger.info("GenerativeEditInpaintProvider: 重绘完成")
             return clean_bg_image
@@ -206,6 +236,107 @@ class GenerativeEditInpaintProvider(InpaintProvider):
         except Exception as e:
             logger.error(f"GenerativeEditInpaintProvider处理失败: {e}", exc_info=True)
             return None
+    
+    def _edit(self, image: Image.Image, aspect_ratio: str, resolution: str) -> Optional[Image.Image]:
+        """调用AI服务对单张图片做清理背景编辑，返回PIL图像，失败返回None"""
+        # 直接传入PIL图像，无需写临时文件
+        clean_bg_image = self.ai_service.edit_image(
+            prompt=self.edit_instruction,
+            current_image_path=image,
+            aspect_ratio=aspect_ratio,
+            resolution=resolution,
+            original_description=None,
+            additional_ref_images=None
+        )
+        
+        if not clean_bg_image:
+            logger.error("GenerativeEditInpaintProvider: 生成式编辑返回空结果")
+            return None
+        
+        # 转换为PIL Image
+        if not isinstance(clean_bg_image, Image.Image):
+            # Google GenAI返回自己的Image类型，需要提取_pil_image
+            if hasattr(clean_bg_image, '_pil_image'):
+                clean_bg_image = clean_bg_image._pil_image
+            else:
+                logger.error(f"GenerativeEditInpaintProvider: 未知的图片类型: {type(clean_bg_image)}")
+                return None
+        
+        return clean_bg_image
+    
+    @staticmethod
+    def _tile_origins(length: int, tile: int, overlap: int) -> List[int]:
+        """计算一个维度上的分块起点：步长 tile - overlap，最后一块贴齐末端"""
+        if length <= tile:
+            return [0]
+        step = max(1, tile - overlap)
+        origins = list(range(0, length - tile, step))
+        origins.append(length - tile)
+        return origins
+    
+    def _tile_and_inpaint(
+        self,
+        image: Image.Image,
+        resolution: str,
+        tile_size: int = 1024,
+        overlap: int = 128
+    ) -> Optional[Image.Image]:
+        """
+        将大图切分为相互重叠的正方形分块，并发重绘后拼接
+        
+        每次模型调用只上传一个分块，单次请求的内存和上传量与原图尺寸无关。
+        分块边长取 min(tile_size, 宽, 高)，所有分块都是正方形，按 1:1 请求不会变形。
+        分块调用提交到共享 AI 线程池，受 MAX_AI_CALL_WORKERS 约束，单张图片最多
+        TILE_MAX_IN_FLIGHT 个分块同时在池中。
+        重叠区域使用余弦羽化权重混合，避免拼接缝。任一分块失败则整体返回None。
+        """
+        image = image.convert('RGB')
+        width, height = image.size
+        side = min(tile_size, width, height)
+        overlap = min(overlap, side // 2)
+        boxes = [
+            (x, y, x + side, y + side)
+            for y in self._tile_origins(height, side, overlap)
+            for x in self._tile_origins(width, side, overlap)
+        ]
+        logger.info(f"GenerativeEditInpaintProvider: 分块重绘 {len(boxes)} 块（{side}px，重叠 {overlap}px）")
+        
+        def edit_tile(index, box):
+            result = self._edit(image.crop(box), "1:1", resolution)
+            if result is None:
+                return index, None
+            return index, result.convert('RGB').resize((side, side), Image.LANCZOS)
+        
+        tiles = [None] * len(boxes)
+        for future in run_in_ai_pool(edit_tile, enumerate(boxes), self.TILE_MAX_IN_FLIGHT):
+            index, tile = future.result()
+            tiles[index] = tile
+        if any(tile is None for tile in tiles):
+            logger.error("GenerativeEditInpaintProvider: 部分分块重绘失败")
+            return None
+        
+        # 余弦羽化：分块边缘的 overlap 像素内权重从 0 平滑升至 1（与图片边界相接的一侧不羽化）
+        ramp = 0.5 - 0.5 * np.cos(np.linspace(0, np.pi, overlap + 2)[1:-1]) if overlap > 0 else np.empty(0)
+        accum = np.zeros((height, width, 3), dtype=np.float32)
+        weight_sum = np.zeros((height, width, 1), dtype=np.float32)
+        for (x0, y0, x1, y1), tile in zip(boxes, tiles):
+            wx = np.ones(side, dtype=np.float32)
+            wy = np.ones(side, dtype=np.float32)
+            if overlap > 0:
+                if x0 > 0:
+                    wx[:overlap] = ramp
+                if x1 < width:
+                    wx[-overlap:] = np.minimum(wx[-overlap:], ramp[::-1])
+                if y0 > 0:
+                    wy[:overlap] = ramp
+                if y1 < height:
+                    wy[-overlap:] = np.minimum(wy[-overlap:], ramp[::-1])
+            weight = np.outer(wy, wx)[:, :, None]
+            accum[y0:y1, x0:x1] += np.asarray(tile, dtype=np.float32) * weight
+            weight_sum[y0:y1, x0:x1] += weight
+        
+        stitched = accum / np.maximum(weight_sum, 1e-6)
+        return Image.fromarray(np.clip(stitched + 0.5, 0, 255).astype(np.uint8), 'RGB')
 
 
 class BaiduInpaintProvider(InpaintProvider):
@@ -387,11 +518,6 @@ class HybridInpaintProvider(InpaintProvider):
             提升画质后的图像
         """
         try:
-            # 保存临时图片
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                tmp_path = tmp_file.name
-                image.save(tmp_path)
-            
             # 将bboxes转换为百分比形式（相对于图片宽高）
             regions = None
             if inpainted_bboxes:
@@ -418,17 +544,16 @@ class HybridInpaintProvider(InpaintProvider):
                 logger.info(f"传递 {len(regions)} 个被修复区域给生成式模型（百分比坐标）")
             
             # 获取画质提升的prompt（包含被修复区域信息）
-            from services.prompts import get_quality_enhancement_prompt
             enhance_prompt = get_quality_enhancement_prompt(inpainted_regions=regions)
             
             # 使用AI服务的aspect_ratio和resolution（如果提供）
             ar = aspect_ratio or self._generative_provider.aspect_ratio
             res = resolution or self._generative_provider.resolution
             
-            # 调用AI服务
+            # 调用AI服务（直接传入PIL图像，无需编码PNG临时文件）
             enhanced_image = self._generative_provider.ai_service.edit_image(
                 prompt=enhance_prompt,
-                current_image_path=tmp_path,
+                current_image_path=image,
                 aspect_ratio=ar,
                 resolution=res,
                 original_description=None,
@@ -480,7 +605,7 @@ class InpaintProviderRegistry:
     
     def __init__(self):
         """初始化注册表"""
-        self._type_mapping: Dict[str, InpaintProvider] = {}
+        self._type_mapping: Mapping[str, InpaintProvider] = {}
         self._default_provider: Optional[InpaintProvider] = None
     
     def register(self, element_type: str, provider: InpaintProvider) -> 'InpaintProviderRegistry':
@@ -510,7 +635,8 @@ class InpaintProviderRegistry:
             self，支持链式调用
         """
         for t in element_types:
-            self.register(t, provider)
+            self._type_mapping[t] = provider
+        logger.debug(f"注册重绘提供者: {', '.join(element_types)} -> {provider.__class__.__name__}")
         return self
     
     def register_default(self, provider: InpaintProvider) -> 'InpaintProviderRegistry':
@@ -540,22 +666,28 @@ class InpaintProviderRegistry:
         if element_type is None:
             return self._default_provider
         
-        # 先查找精确匹配
-        if element_type in self._type_mapping:
-            return self._type_mapping[element_type]
+        # 精确匹配，未注册则返回默认提供者
+        return self._type_mapping.get(element_type, self._default_provider)
+    
+    def freeze(self) -> 'InpaintProviderRegistry':
+        """
+        冻结类型映射为只读，之后调用 register/register_types 会抛出 TypeError
         
-        # 返回默认提供者
-        return self._default_provider
+        Returns:
+            self，支持链式调用
+        """
+        self._type_mapping = types.MappingProxyType(dict(self._type_mapping))
+        return self
     
     def get_all_providers(self) -> List[InpaintProvider]:
         """
-        获取所有已注册的重绘提供者（去重）
+        获取所有已注册的重绘提供者（去重，保持注册顺序）
         
         Returns:
             重绘提供者列表
         """
-        providers = list(set(self._type_mapping.values()))
-        if self._default_provider and self._default_provider not in providers:
+        providers = list(dict.fromkeys(self._type_mapping.values()))
+        if self._default_provider is not None and self._default_provider not in providers:
             providers.append(self._default_provider)
         return providers
     
@@ -606,5 +738,5 @@ class InpaintProviderRegistry:
                    f"文本/表格->{mask_provider.__class__.__name__ if mask_provider else 'None'}, "
                    f"图片->{image_provider.__class__.__name__ if image_provider else 'None'}")
         
-        return registry
+        return registry.freeze()
 
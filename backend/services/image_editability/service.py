@@ -9,6 +9,7 @@
 """
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 from PIL import Image
 
@@ -21,6 +22,10 @@ from .helpers import collect_bboxes_from_elements, should_recurse_into_element,
 
 logger = logging.getLogger(__name__)
 
+# 所有图片共享的 clean background 后台线程池：需要递归子元素时在此生成背景，与子元素处理重叠
+# （背景生成不会再向本线程池提交任务，共享不会死锁）
+_clean_background_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='clean-bg')
+
 
 class ImageEditabilityService:
     """
@@ -58,6 +63,7 @@ class ImageEditabilityService:
         self._max_depth = config.max_depth
         self._min_image_size = config.min_image_size
         self._min_image_area = config.min_image_area
+        self._inpaint_options = config.inpaint_options
         self._max_child_coverage_ratio = 0.85
         
         extractors = self._extractor_registry.get_all_extractors()
@@ -142,9 +148,13 @@ class ImageEditabilityService:
         logger.info(f"{'  ' * depth}提取到 {len(elements)} 个元素")
         
         # 3. 生成clean background（根据元素类型选择重绘方法）
+        # 重绘只读取元素的bbox和类型，与第4步的子元素递归互不依赖：
+        # 需要递归时放到后台线程执行，使两者的网络等待（生成式重绘/版面分析）相互重叠
         clean_background = None
+        clean_background_future = None
+        need_children = depth + 1 < self._max_depth
         if self._inpaint_registry and elements:
-            clean_background = self._generate_clean_background(
+            clean_background_kwargs = dict(
                 image_path=image_path,
                 elements=elements,
                 image_id=image_id,
@@ -154,19 +164,29 @@ class ImageEditabilityService:
                 image_size=(width, height),
                 element_type=element_type  # 传递元素类型以选择对应的重绘方法
             )
+            if need_children:
+                clean_background_future = _clean_background_pool.submit(
+                    self._generate_clean_background, **clean_background_kwargs
+                )
+            else:
+                clean_background = self._generate_clean_background(**clean_background_kwargs)
         
         # 4. 递归处理子元素
         # max_depth 语义：max_depth=1 表示只处理1层不递归，max_depth=2 递归一次
-        if depth + 1 < self._max_depth:
-            self._process_children(
-                elements=elements,
-                current_image_path=image_path,
-                depth=depth,
-                image_id=image_id,
-                root_image_size=root_image_size,
-                current_image_size=(width, height),
-                root_image_path=root_image_path
-            )
+        try:
+            if need_children:
+                self._process_children(
+                    elements=elements,
+                    current_image_path=image_path,
+                    depth=depth,
+                    image_id=image_id,
+                    root_image_size=root_image_size,
+                    current_image_size=(width, height),
+                    root_image_path=root_image_path
+                )
+        finally:
+            if clean_background_future is not None:
+                clean_background = clean_background_future.result()
         
         # 5. 构建结果
         editable_image = EditableImage(
@@ -321,8 +341,11 @@ class ImageEditabilityService:
             logger.warning(f"{'  ' * depth}未找到重绘方法，跳过")
             return None
         
+        img = None
+        full_page_img = None
         try:
             bboxes = collect_bboxes_from_elements(elements)
+            # 图像需保持打开直到重绘完成（重绘时才解码像素），在 finally 中关闭
             img = Image.open(image_path)
             img_width, img_height = img.size
             element_types = [elem.element_type for elem in elements]
@@ -341,7 +364,6 @@ class ImageEditabilityService:
                 crop_box = None
             
             # 加载完整页面图像
-            full_page_img = None
             if root_image_path != image_path:
                 full_page_img = Image.open(root_image_path)
             
@@ -373,20 +395,39 @@ class ImageEditabilityService:
                 expand_pixels=10,
                 save_mask_path=str(output_dir / 'mask.png'),
                 full_page_image=full_page_img,
-                crop_box=crop_box
+                crop_box=crop_box,
+                **self._inpaint_options
             )
             
             if result_img is None:
                 return None
             
             # 保存结果
-            output_path = output_dir / 'clean_background.png'
-            result_img.save(str(output_path))
+            # 整页背景保存为JPEG（体积小、编码快）；子元素背景可能依赖透明度，仍保存为PNG
+            if depth == 0:
+                if result_img.mode in ('RGBA', 'LA', 'P'):
+                    rgba_img = result_img.convert('RGBA')
+                    background = Image.new('RGB', rgba_img.size, (255, 255, 255))
+                    background.paste(rgba_img, mask=rgba_img.split()[-1])
+                    result_img = background
+                elif result_img.mode != 'RGB':
+                    result_img = result_img.convert('RGB')
+                output_path = output_dir / 'clean_background.jpg'
+                result_img.save(str(output_path), format='JPEG', quality=88, optimize=False, progressive=False)
+            else:
+                output_path = output_dir / 'clean_background.png'
+                result_img.save(str(output_path))
             return str(output_path)
         
         except Exception as e:
             logger.error(f"生成clean background失败: {e}", exc_info=True)
             return None
+        
+        finally:
+            if img is not None:
+                img.close()
+            if full_page_img is not None:
+                full_page_img.close()
     
     def _process_children(
         self,
@@ -1,13 +1,17 @@
 """
 PDF Service - PDF splitting utilities using PyPDF2
 """
+import json
 import logging
 import os
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 from PyPDF2 import PdfReader, PdfWriter
 
 logger = logging.getLogger(__name__)
 
+# 拆分结果元数据文件：记录源 PDF 的指纹和页数，用于重试时跳过重复拆分
+SPLIT_META_FILENAME = '.meta.json'
+
 
 def split_pdf_to_pages(pdf_path: str, output_dir: str) -> List[str]:
     """
@@ -20,20 +24,98 @@ def split_pdf_to_pages(pdf_path: str, output_dir: str) -> List[str]:
     Returns:
         List of file paths for each single-page PDF, ordered by page number
     """
+    _, page_iter = iter_split_pdf_pages(pdf_path, output_dir)
+    page_paths = list(page_iter)
+
+    logger.info(f"Split PDF into {len(page_paths)} pages: {pdf_path}")
+    return page_paths
+
+
+def iter_split_pdf_pages(pdf_path: str, output_dir: str) -> Tuple[int, Iterator[str]]:
+    """
+    Split a PDF lazily: the page count is known up front, and each single-page
+    PDF is written only when the iterator reaches it, so callers can start
+    processing the first pages before the whole document has been split.
+
+    Args:
+        pdf_path: Path to the source PDF file
+        output_dir: Directory to write individual page PDFs
+
+    Returns:
+        Tuple of (page_count, iterator of single-page PDF paths in page order)
+    """
     os.makedirs(output_dir, exist_ok=True)
 
+    # 同一份 PDF 已拆分过（如任务失败后重试），直接复用已写好的单页文件，只拆分剩余页面
+    source_key = _pdf_source_key(pdf_path)
+    meta_path = os.path.join(output_dir, SPLIT_META_FILENAME)
+    split_meta = _load_split_meta(output_dir, source_key)
+    if split_meta is not None:
+        page_count, written_paths = split_meta
+        if len(written_paths) == page_count:
+            logger.info(f"Reusing {page_count} split pages in {output_dir}")
+            return page_count, iter(written_paths)
+        logger.info(f"Reusing {len(written_paths)}/{page_count} split pages in {output_dir}")
+    else:
+        written_paths = []
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
     reader = PdfReader(pdf_path)
-    page_paths = []
+    page_count = len(reader.pages)
 
-    for i, page in enumerate(reader.pages):
-        writer = PdfWriter()
-        writer.add_page(page)
+    def write_pages() -> Iterator[str]:
+        pages_written = len(written_paths)
+        try:
+            yield from written_paths
+            for i in range(pages_written, page_count):
+                writer = PdfWriter()
+                writer.add_page(reader.pages[i])
 
-        page_path = os.path.join(output_dir, f"page_{i + 1}.pdf")
-        with open(page_path, "wb") as f:
-            writer.write(f)
+                page_path = os.path.join(output_dir, f"page_{i + 1}.pdf")
+                with open(page_path, "wb") as f:
+                    writer.write(f)
+                pages_written += 1
 
-        page_paths.append(page_path)
+                yield page_path
+        finally:
+            # 拆分结束或中途停止（调用方关闭迭代器）时记录已完整写出的页数，下次只拆分剩余页面
+            if pages_written:
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'source_key': source_key,
+                        'page_count': page_count,
+                        'pages_written': pages_written,
+                    }, f)
 
-    logger.info(f"Split PDF into {len(page_paths)} pages: {pdf_path}")
-    return page_paths
+    return page_count, write_pages()
+
+
+def _pdf_source_key(pdf_path: str) -> str:
+    """Fingerprint of the source PDF (size + mtime)"""
+    stat = os.stat(pdf_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _load_split_meta(output_dir: str, source_key: str) -> Optional[Tuple[int, List[str]]]:
+    """
+    Return (page_count, paths of pages already written) if the split in output_dir
+    was produced from the same source PDF, otherwise None
+    """
+    meta_path = os.path.join(output_dir, SPLIT_META_FILENAME)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get('source_key') != source_key:
+        return None
+    page_count = meta.get('page_count', 0)
+    page_paths = [
+        os.path.join(output_dir, f"page_{i + 1}.pdf")
+        for i in range(meta.get('pages_written', page_count))
+    ]
+    if not all(os.path.isfile(path) for path in page_paths):
+        return None
+    return page_count, page_paths
@@ -2,22 +2,141 @@
 Task Manager - handles background tasks using ThreadPoolExecutor
 No need for Celery or Redis, uses in-memory task tracking
 """
+import functools
+import io
+import json
 import logging
 import os
+import shutil
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, List, Dict, Any, Optional
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import func, insert, select, update
 from PIL import Image
-from models import db, Task, Page, Material, PageImageVersion
+from models import db, Task, Page, Material, PageImageVersion, Project
 from utils import get_filtered_pages
-from utils.image_utils import check_image_resolution
+from utils.image_utils import get_resolution_category
+from utils.ai_pool import run_in_ai_pool
 from pathlib import Path
-from services.pdf_service import split_pdf_to_pages
+from services.pdf_service import iter_split_pdf_pages
+from services.export_service import ExportService, ExportError
+from services.image_editability import TextAttributeExtractorFactory
+from services.ai_service_manager import get_ai_service
 
 logger = logging.getLogger(__name__)
 
+# 缩略图保存线程池：缓存缩略图（JPEG）的编码和写盘与原图（PNG）保存并行执行
+_image_save_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='img-save')
+
+# 临时目录清理线程：删除操作不阻塞任务完成
+_cleanup_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rmtree')
+
+# 导出任务进度中每类警告明细最多保留的条数（前端只展示前 10 条，总数单独记录）
+WARNING_DETAILS_MAX_ITEMS = 50
+
+# 描述生成结果每累积多少页提交一次数据库（同时更新一次任务进度）
+DESCRIPTION_COMMIT_BATCH_SIZE = 10
+
+# 图片生成任务两次写入进度之间的最小间隔（秒）
+PROGRESS_WRITE_INTERVAL = 1.0
+
+# 图片生成任务中模板路径的缓存时间（秒），过期后重新查询以获取新上传的模板
+TEMPLATE_PATH_CACHE_TTL = 1.0
+
+
+# 后台任务工作线程的线程本地状态
+_worker_local = threading.local()
+
+
+def _ensure_worker_app_context(app):
+    """
+    在当前工作线程中推入一次应用上下文并保留，同一线程后续的调用直接复用
+
+    Flask-SQLAlchemy 的 db.session 按应用上下文划分作用域，因此每个工作线程
+    都持有自己独立的会话，不会与任务主线程或其他工作线程共享。线程遇到另一个
+    app 时先弹出之前推入的上下文，每个线程至多保留一个上下文。上下文绑定在线程
+    自身（contextvars），无法由其他线程统一弹出，因此每个任务都必须在结束时调用
+    db.session.remove()，留给下一个任务的上下文中不含未释放的会话。
+    """
+    if getattr(_worker_local, 'app', None) is app:
+        return
+    previous_ctx = getattr(_worker_local, 'app_ctx', None)
+    if previous_ctx is not None:
+        previous_ctx.pop()
+    ctx = app.app_context()
+    ctx.push()
+    _worker_local.app = app
+    _worker_local.app_ctx = ctx
+
+
+@functools.lru_cache(maxsize=1)
+def _get_caption_extractor(ai_service):
+    """
+    复用文字属性提取器，避免每个导出任务重复创建
+
+    以 AIService 实例为缓存键：设置变更后 AIService 单例被重建时会自动换新提取器
+    """
+    return TextAttributeExtractorFactory.create_caption_model_extractor(ai_service=ai_service)
+
+
+def _dump_progress(progress: Dict[str, Any]) -> str:
+    """
+    序列化任务进度：紧凑分隔符 + 保留中文原文
+
+    进度消息以中文为主，不转义为 \\uXXXX 可使写入数据库的进度 JSON 减少约四成，编码耗时不变。
+    """
+    return json.dumps(progress, ensure_ascii=False, separators=(',', ':'))
+
+
+def _write_task_progress(task_id: str, progress: Dict[str, Any]):
+    """
+    直接以 UPDATE 写入任务进度（不提交），不先加载 Task 行
+
+    任务循环在内存中维护进度字典，提交后已过期的 Task 对象不会因读取旧进度而重新查询。
+    """
+    db.session.execute(
+        update(Task).where(Task.id == task_id).values(progress=_dump_progress(progress))
+    )
+
+
+def _mark_task_processing(task_id: str) -> bool:
+    """
+    以单条 UPDATE 将任务置为 PROCESSING（不提交），不先加载 Task 行
+
+    紧随其后只有数据库读写的任务把它并入下一次提交（初始进度或页面状态）；
+    之后马上进入耗时操作的任务应立即提交，让前端尽早看到 PROCESSING。
+
+    Returns:
+        任务是否存在
+    """
+    result = db.session.execute(
+        update(Task).where(Task.id == task_id).values(status='PROCESSING')
+    )
+    return result.rowcount > 0
+
+
+def _finalize_task(task_id: str, status: str, progress: Optional[Dict[str, Any]] = None,
+                   error_message: Optional[str] = None):
+    """
+    以单条 UPDATE 写入任务终态（状态、完成时间及可选的进度、错误信息），不提交
+
+    调用方把它与收尾阶段的其他写入（项目/页面状态）合并为一次提交。
+    """
+    values = {'status': status, 'completed_at': func.now()}
+    if progress is not None:
+        values['progress'] = _dump_progress(progress)
+    if error_message is not None:
+        values['error_message'] = error_message
+    db.session.execute(update(Task).where(Task.id == task_id).values(**values))
+
+
+def _remove_temp_dir_async(temp_dir: str):
+    """在后台线程中删除临时目录（目录不存在或删除失败时忽略）"""
+    _cleanup_pool.submit(shutil.rmtree, temp_dir, ignore_errors=True)
+
 
 class TaskManager:
     """Simple task manager using ThreadPoolExecutor"""
@@ -25,15 +144,13 @@ class TaskManager:
     def __init__(self, max_workers: int = 4):
         """Initialize task manager"""
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.active_tasks = {}  # task_id -> Future
-        self.lock = threading.Lock()
+        # task_id -> Future；dict 的单次读写、pop 和 in 在 CPython 中是原子操作，无需额外加锁
+        self.active_tasks = {}
     
     def submit_task(self, task_id: str, func: Callable, *args, **kwargs):
         """Submit a background task"""
         future = self.executor.submit(func, task_id, *args, **kwargs)
-        
-        with self.lock:
-            self.active_tasks[task_id] = future
+        self.active_tasks[task_id] = future
         
         # Add callback to clean up when done and log exceptions
         future.add_done_callback(lambda f: self._task_done_callback(task_id, f))
@@ -52,14 +169,11 @@ class TaskManager:
     
     def _cleanup_task(self, task_id: str):
         """Clean up completed task"""
-        with self.lock:
-            if task_id in self.active_tasks:
-                del self.active_tasks[task_id]
+        self.active_tasks.pop(task_id, None)
     
     def is_task_active(self, task_id: str) -> bool:
         """Check if task is still running"""
-        with self.lock:
-            return task_id in self.active_tasks
+        return task_id in self.active_tasks
     
     def shutdown(self):
         """Shutdown the executor"""
@@ -70,6 +184,141 @@ class TaskManager:
 task_manager = TaskManager(max_workers=4)
 
 
+def _save_image_files(image, project_id: str, page_id: str, file_service,
+                      version_number: int, image_format: str = 'PNG') -> tuple[str, str]:
+    """
+    按版本号保存原图和压缩的缓存图片，返回 (image_path, cached_image_path)，不涉及数据库
+    """
+    # 先完成解码，当前线程与缩略图线程共享同一份已加载的像素数据
+    image.load()
+
+    # 在后台线程生成并保存压缩的缓存图片（用于前端快速显示）
+    cached_future = _image_save_pool.submit(
+        file_service.save_cached_image,
+        image, project_id, page_id,
+        version_number=version_number,
+        quality=85
+    )
+
+    # 同时在当前线程保存原图到最终位置（使用版本号）
+    image_path = file_service.save_generated_image(
+        image, project_id, page_id,
+        version_number=version_number,
+        image_format=image_format
+    )
+    return image_path, cached_future.result()
+
+
+def _next_version_numbers(page_ids: List[str]) -> Dict[str, int]:
+    """一次查询得到每个页面的下一个图片版本号（没有历史版本的页面从 1 开始）"""
+    rows = db.session.execute(
+        select(PageImageVersion.page_id, func.max(PageImageVersion.version_number))
+        .where(PageImageVersion.page_id.in_(page_ids))
+        .group_by(PageImageVersion.page_id)
+    ).all()
+    max_versions = dict(rows)
+    return {page_id: (max_versions.get(page_id) or 0) + 1 for page_id in page_ids}
+
+
+def _staged_image_key(page_id: str, task_id: str) -> str:
+    """批量生成任务中子线程保存图片时使用的文件名前缀（带任务 ID，不会与正式版本文件重名）"""
+    return f"{page_id}_{task_id}"
+
+
+def _final_image_paths(item: Dict[str, Any], file_service, version_number: int) -> tuple[str, str]:
+    """子线程按临时文件名保存的图片对应的正式版本文件路径 (image_path, cached_image_path)"""
+    image_path = Path(item['image_path'])
+    final_image_path = image_path.with_name(
+        f"{item['page_id']}_v{version_number}{image_path.suffix}"
+    ).as_posix()
+    final_cached_path = file_service.get_cached_image_path(
+        item['project_id'], item['page_id'], version_number
+    )
+    return final_image_path, final_cached_path
+
+
+def _rename_files(renames: List[tuple], file_service):
+    """按 (源路径, 目标路径) 依次改名；中途失败时把已改名的文件改回原名后重新抛出异常"""
+    done = []
+    try:
+        for src, dst in renames:
+            os.replace(file_service.get_absolute_path(src), file_service.get_absolute_path(dst))
+            done.append((src, dst))
+    except Exception:
+        for src, dst in reversed(done):
+            try:
+                os.replace(file_service.get_absolute_path(dst), file_service.get_absolute_path(src))
+            except OSError:
+                logger.exception(f"Failed to restore staged image file {src}")
+        raise
+
+
+def _remove_staged_image_files(project_id: str, task_id: str, file_service):
+    """删除本任务尚未改名为正式版本的临时图片文件（任务失败或中途退出时残留）"""
+    # 临时文件名形如 {page_id}_{task_id}_v0.png / _v0_thumb.jpg，与缓存图片位于同一目录
+    marker = f"{_staged_image_key('', task_id)}_v0"
+    pages_dir = Path(file_service.get_absolute_path(
+        file_service.get_cached_image_path(project_id, _staged_image_key('', task_id), 0)
+    )).parent
+    try:
+        entries = list(os.scandir(pages_dir))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if marker in entry.name:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                logger.warning(f"Failed to remove staged image file {entry.path}")
+
+
+def _bulk_save_image_versions(saved_images: List[Dict[str, Any]], file_service):
+    """
+    批量写入一组已保存图片的版本记录，并更新对应页面（不提交，由调用方提交）
+
+    saved_images 中每项包含 page_id、project_id，以及子线程按临时文件名保存的 image_path、
+    cached_image_path。先执行 UPDATE 拿到写锁，再在同一事务中查询最大版本号分配新版本号，
+    与编辑、单页生成等并发保存的版本不会重号或互相覆盖。所有语句执行成功后才把临时文件
+    改名为正式版本文件；改名失败时已改名的文件会被还原，调用方回滚事务即可恢复原状。
+    """
+    if not saved_images:
+        return
+    page_ids = [item['page_id'] for item in saved_images]
+    db.session.execute(
+        update(PageImageVersion)
+        .where(PageImageVersion.page_id.in_(page_ids), PageImageVersion.is_current.is_(True))
+        .values(is_current=False)
+    )
+    next_versions = _next_version_numbers(page_ids)
+    records = []
+    renames = []
+    for item in saved_images:
+        version_number = next_versions[item['page_id']]
+        image_path, cached_image_path = _final_image_paths(item, file_service, version_number)
+        records.append((item['page_id'], image_path, cached_image_path, version_number))
+        renames.append((item['image_path'], image_path))
+        renames.append((item['cached_image_path'], cached_image_path))
+    db.session.execute(insert(PageImageVersion), [
+        {
+            'page_id': page_id,
+            'image_path': image_path,
+            'version_number': version_number,
+            'is_current': True,
+        }
+        for page_id, image_path, _, version_number in records
+    ])
+    db.session.execute(update(Page), [
+        {
+            'id': page_id,
+            'generated_image_path': image_path,
+            'cached_image_path': cached_image_path,
+            'status': 'COMPLETED',
+        }
+        for page_id, image_path, cached_image_path, _ in records
+    ])
+    _rename_files(renames, file_service)
+
+
 def save_image_with_version(image, project_id: str, page_id: str, file_service,
                             page_obj=None, image_format: str = 'PNG') -> tuple[str, int]:
     """
@@ -87,32 +336,32 @@ def save_image_with_version(image, project_id: str, page_id: str, file_service,
         tuple: (image_path, version_number) - 图片路径和版本号
 
     这个函数会：
-    1. 计算下一个版本号（使用 MAX 查询确保安全）
-    2. 标记所有旧版本为非当前版本
-    3. 保存图片到最终位置
-    4. 生成并保存压缩的缓存图片
-    5. 创建新版本记录
-    6. 如果提供了 page_obj，更新页面状态和图片路径
+    1. 将当前版本标记为非当前版本，并通过 RETURNING 得到最大版本号，计算下一个版本号
+    2. 保存图片到最终位置
+    3. 生成并保存压缩的缓存图片
+    4. 创建新版本记录
+    5. 如果提供了 page_obj，更新页面状态和图片路径
     """
-    # 使用 MAX 查询确保版本号安全（即使有版本被删除也不会重复）
-    max_version = db.session.query(func.max(PageImageVersion.version_number)).filter_by(page_id=page_id).scalar() or 0
-    next_version = max_version + 1
-
-    # 批量更新：标记所有旧版本为非当前版本（使用单条 SQL 更高效）
-    PageImageVersion.query.filter_by(page_id=page_id).update({'is_current': False})
-
-    # 保存原图到最终位置（使用版本号）
-    image_path = file_service.save_generated_image(
-        image, project_id, page_id,
-        version_number=next_version,
-        image_format=image_format
+    # 单条 UPDATE ... RETURNING：只把当前版本（最多一行）标记为非当前版本，同时取回最大版本号
+    # 先拿到写锁再基于最大版本号计算新版本号（即使有版本被删除也不会重复），并发保存时不会重号
+    latest_version = (
+        select(func.max(PageImageVersion.version_number))
+        .where(PageImageVersion.page_id == page_id)
+        .scalar_subquery()
     )
+    max_version = db.session.execute(
+        update(PageImageVersion)
+        .filter_by(page_id=page_id, is_current=True)
+        .values(is_current=False)
+        .returning(latest_version)
+    ).scalar()
+    if max_version is None:
+        # 没有当前版本（如首次保存），单独查询最大版本号
+        max_version = db.session.query(func.max(PageImageVersion.version_number)).filter_by(page_id=page_id).scalar() or 0
+    next_version = max_version + 1
 
-    # 生成并保存压缩的缓存图片（用于前端快速显示）
-    cached_image_path = file_service.save_cached_image(
-        image, project_id, page_id,
-        version_number=next_version,
-        quality=85
+    image_path, cached_image_path = _save_image_files(
+        image, project_id, page_id, file_service, next_version, image_format
     )
 
     # 创建新版本记录
@@ -165,14 +414,10 @@ def generate_descriptions_task(task_id: str, project_id: str, ai_service,
     # 在整个任务中保持应用上下文
     with app.app_context():
         try:
-            # 重要：在后台线程开始时就获取task和设置状态
-            task = Task.query.get(task_id)
-            if not task:
+            # 重要：在后台线程开始时就设置任务状态
+            if not _mark_task_processing(task_id):
                 logger.error(f"Task {task_id} not found")
                 return
-            
-            task.status = 'PROCESSING'
-            db.session.commit()
             logger.info(f"Task {task_id} status updated to PROCESSING")
             
             # Flatten outline to get pages
@@ -184,12 +429,13 @@ def generate_descriptions_task(task_id: str, project_id: str, ai_service,
             if len(pages) != len(pages_data):
                 raise ValueError("Page count mismatch")
             
-            # Initialize progress
-            task.set_progress({
+            # Initialize progress（进度字典保留在内存中，之后直接写库）
+            progress = {
                 "total": len(pages),
                 "completed": 0,
                 "failed": 0
-            })
+            }
+            _write_task_progress(task_id, progress)
             db.session.commit()
             
             # Generate descriptions in parallel
@@ -201,90 +447,91 @@ def generate_descriptions_task(task_id: str, project_id: str, ai_service,
                 Generate description for a single page
                 注意：只传递 page_id（字符串），不传递 ORM 对象，避免跨线程会话问题
                 """
-                # 关键修复：在子线程中也需要应用上下文
-                with app.app_context():
-                    try:
-                        # Get singleton AI service instance
-                        from services.ai_service_manager import get_ai_service
-                        ai_service = get_ai_service()
-                        
-                        desc_text = ai_service.generate_page_description(
-                            project_context, outline, page_outline, page_index,
-                            language=language
-                        )
-                        
-                        # Parse description into structured format
-                        # This is a simplified version - you may want more sophisticated parsing
-                        desc_content = {
-                            "text": desc_text,
-                            "generated_at": datetime.utcnow().isoformat()
-                        }
-                        
-                        return (page_id, desc_content, None)
-                    except Exception as e:
-                        import traceback
-                        error_detail = traceback.format_exc()
-                        logger.error(f"Failed to generate description for page {page_id}: {error_detail}")
-                        return (page_id, None, str(e))
-            
-            # Use ThreadPoolExecutor for parallel generation
-            # 关键：提前提取 page.id，不要传递 ORM 对象到子线程
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [
-                    executor.submit(generate_single_desc, page.id, page_data, i)
-                    for i, (page, page_data) in enumerate(zip(pages, pages_data), 1)
-                ]
-                
-                # Process results as they complete
-                for future in as_completed(futures):
-                    page_id, desc_content, error = future.result()
+                # 工作线程复用长期保留的应用上下文，不再每页推入/弹出一次
+                _ensure_worker_app_context(app)
+                try:
+                    desc_text = ai_service.generate_page_description(
+                        project_context, outline, page_outline, page_index,
+                        language=language
+                    )
                     
-                    db.session.expire_all()
+                    # Parse description into structured format
+                    # This is a simplified version - you may want more sophisticated parsing
+                    desc_content = {
+                        "text": desc_text,
+                        "generated_at": datetime.utcnow().isoformat()
+                    }
                     
-                    # Update page in database
-                    page = Page.query.get(page_id)
-                    if page:
-                        if error:
-                            page.status = 'FAILED'
-                            failed += 1
-                        else:
-                            page.set_description_content(desc_content)
-                            page.status = 'DESCRIPTION_GENERATED'
-                            completed += 1
-                        
-                        db.session.commit()
-                    
-                    # Update task progress
-                    task = Task.query.get(task_id)
-                    if task:
-                        task.update_progress(completed=completed, failed=failed)
-                        db.session.commit()
-                        logger.info(f"Description Progress: {completed}/{len(pages)} pages completed")
+                    return (page_id, desc_content, None)
+                except Exception as e:
+                    logger.exception(f"Failed to generate description for page {page_id}")
+                    return (page_id, None, str(e))
+                finally:
+                    # 上下文在共享线程池中跨任务复用，每页结束后释放数据库会话
+                    db.session.remove()
             
-            # Mark task as completed
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'COMPLETED'
-                task.completed_at = datetime.utcnow()
-                db.session.commit()
-                logger.info(f"Task {task_id} COMPLETED - {completed} pages generated, {failed} failed")
+            # Use the shared AI pool for parallel generation
+            # 关键：提前提取 page.id，不要传递 ORM 对象到子线程
+            futures = run_in_ai_pool(
+                generate_single_desc,
+                ((page.id, page_data, i) for i, (page, page_data) in enumerate(zip(pages, pages_data), 1)),
+                max_workers
+            )
+            
+            # Process results as they complete
+            # 结果先在内存中累积，每 DESCRIPTION_COMMIT_BATCH_SIZE 个（以及最后一批）统一写库并提交一次
+            pending = []
+            
+            def flush_pending(commit=True):
+                nonlocal completed, failed
+                # 按主键批量更新本批页面（ORM bulk UPDATE），不经过逐个对象的 unit-of-work
+                page_updates = []
+                for page_id, desc_content, error in pending:
+                    if error:
+                        page_updates.append({'id': page_id, 'status': 'FAILED'})
+                        failed += 1
+                    else:
+                        page_updates.append({
+                            'id': page_id,
+                            'status': 'DESCRIPTION_GENERATED',
+                            'description_content': Page.serialize_json(desc_content),
+                        })
+                        completed += 1
+                pending.clear()
+                db.session.execute(update(Page), page_updates)
+                
+                # Update task progress（与页面更新在同一事务中提交）
+                progress['completed'] = completed
+                progress['failed'] = failed
+                _write_task_progress(task_id, progress)
+                if commit:
+                    db.session.commit()
+                logger.info(f"Description Progress: {completed}/{len(pages)} pages completed")
+            
+            for future in futures:
+                pending.append(future.result())
+                if len(pending) >= DESCRIPTION_COMMIT_BATCH_SIZE:
+                    flush_pending()
+            if pending:
+                # 最后一批与任务终态一起提交
+                flush_pending(commit=False)
+            
+            # Mark task as completed（与项目状态在同一事务中提交）
+            _finalize_task(task_id, 'COMPLETED')
             
             # Update project status
-            from models import Project
             project = Project.query.get(project_id)
             if project and failed == 0:
                 project.status = 'DESCRIPTIONS_GENERATED'
-                db.session.commit()
+            db.session.commit()
+            logger.info(f"Task {task_id} COMPLETED - {completed} pages generated, {failed} failed")
+            if project and failed == 0:
                 logger.info(f"Project {project_id} status updated to DESCRIPTIONS_GENERATED")
         
         except Exception as e:
             # Mark task as failed
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'FAILED'
-                task.error_message = str(e)
-                task.completed_at = datetime.utcnow()
-                db.session.commit()
+            _finalize_task(task_id, 'FAILED', error_message=str(e))
+            db.session.commit()
 
 
 def generate_images_task(task_id: str, project_id: str, ai_service, file_service,
@@ -308,15 +555,13 @@ def generate_images_task(task_id: str, project_id: str, ai_service, file_service
         raise ValueError("Flask app instance must be provided")
     
     with app.app_context():
+        # 任务开始时置为 GENERATING 的页面，失败时需要改回 FAILED
+        generating_page_ids = []
         try:
             # Update task status to PROCESSING
-            task = Task.query.get(task_id)
-            if not task:
+            if not _mark_task_processing(task_id):
                 return
             
-            task.status = 'PROCESSING'
-            db.session.commit()
-            
             # Get pages for this project (filtered by page_ids if provided)
             pages = get_filtered_pages(project_id, page_ids)
             all_pages_data = ai_service.flatten_outline(outline)
@@ -325,17 +570,40 @@ def generate_images_task(task_id: str, project_id: str, ai_service, file_service
             # get matched to the correct outline entry (not just first N)
             pages_data_by_index = {i: pd for i, pd in enumerate(all_pages_data)}
             
-            # 注意：不在任务开始时获取模板路径，而是在每个子线程中动态获取
+            # 注意：不在任务开始时获取模板路径，而是在子线程中动态获取
             # 这样可以确保即使用户在上传新模板后立即生成，也能使用最新模板
+            # 查询结果在本任务内缓存 TEMPLATE_PATH_CACHE_TTL 秒，避免每页都查库和访问文件系统
+            template_cache = {'path': None, 'resolved_at': None}
+            template_lock = threading.Lock()
+            
+            def get_template_path():
+                with template_lock:
+                    now = time.monotonic()
+                    resolved_at = template_cache['resolved_at']
+                    if resolved_at is None or now - resolved_at >= TEMPLATE_PATH_CACHE_TTL:
+                        template_cache['path'] = file_service.get_template_path(project_id)
+                        template_cache['resolved_at'] = now
+                    return template_cache['path']
+            
+            # 所有待生成页面的状态在任务开始时一次性更新，不再由每个子线程单独提交
+            if pages:
+                generating_page_ids = [page.id for page in pages]
+                Page.query.filter(Page.id.in_(generating_page_ids)).update(
+                    {'status': 'GENERATING'}, synchronize_session=False
+                )
             
-            # Initialize progress
-            task.set_progress({
+            # Initialize progress（进度字典保留在内存中，之后直接写库）
+            progress = {
                 "total": len(pages),
                 "completed": 0,
                 "failed": 0
-            })
+            }
+            _write_task_progress(task_id, progress)
             db.session.commit()
             
+            # 期望的分辨率档位只需解析一次，子线程中直接比较
+            expected_res = resolution.upper()
+            
             # Generate images in parallel
             completed = 0
             failed = 0
@@ -346,168 +614,193 @@ def generate_images_task(task_id: str, project_id: str, ai_service, file_service
                 Generate image for a single page
                 注意：只传递 page_id（字符串），不传递 ORM 对象，避免跨线程会话问题
                 """
-                # 关键修复：在子线程中也需要应用上下文
-                with app.app_context():
-                    try:
-                        logger.debug(f"Starting image generation for page {page_id}, index {page_index}")
-                        # Get page from database in this thread
-                        page_obj = Page.query.get(page_id)
-                        if not page_obj:
-                            raise ValueError(f"Page {page_id} not found")
-                        
-                        # Update page status
-                        page_obj.status = 'GENERATING'
-                        db.session.commit()
-                        logger.debug(f"Page {page_id} status updated to GENERATING")
-                        
-                        # Get description content
-                        desc_content = page_obj.get_description_content()
-                        if not desc_content:
-                            raise ValueError("No description content for page")
-                        
-                        # 获取描述文本（可能是 text 字段或 text_content 数组）
-                        desc_text = desc_content.get('text', '')
-                        if not desc_text and desc_content.get('text_content'):
-                            # 如果 text 字段不存在，尝试从 text_content 数组获取
-                            text_content = desc_content.get('text_content', [])
-                            if isinstance(text_content, list):
-                                desc_text = '\n'.join(text_content)
-                            else:
-                                desc_text = str(text_content)
-                        
-                        logger.debug(f"Got description text for page {page_id}: {desc_text[:100]}...")
-                        
-                        # 从当前页面的描述内容中提取图片 URL
-                        page_additional_ref_images = []
-                        has_material_images = False
-                        
-                        # 从描述文本中提取图片
-                        if desc_text:
-                            image_urls = ai_service.extract_image_urls_from_markdown(desc_text)
-                            if image_urls:
-                                logger.info(f"Found {len(image_urls)} image(s) in page {page_id} description")
-                                page_additional_ref_images = image_urls
-                                has_material_images = True
-                        
-                        # 在子线程中动态获取模板路径，确保使用最新模板
-                        page_ref_image_path = None
-                        if use_template:
-                            page_ref_image_path = file_service.get_template_path(project_id)
-                            # 注意：如果有风格描述，即使没有模板图片也允许生成
-                            # 这个检查已经在 controller 层完成，这里不再检查
-                        
-                        # Generate image prompt
-                        prompt = ai_service.generate_image_prompt(
-                            outline, page_data, desc_text, page_index,
-                            has_material_images=has_material_images,
-                            extra_requirements=extra_requirements,
-                            language=language,
-                            has_template=use_template
-                        )
-                        logger.debug(f"Generated image prompt for page {page_id}")
-                        
-                        # Generate image
-                        logger.info(f"🎨 Calling AI service to generate image for page {page_index}/{len(pages)}...")
-                        image = ai_service.generate_image(
-                            prompt, page_ref_image_path, aspect_ratio, resolution,
-                            additional_ref_images=page_additional_ref_images if page_additional_ref_images else None
-                        )
-                        logger.info(f"✅ Image generated successfully for page {page_index}")
-                        
-                        if not image:
-                            raise ValueError("Failed to generate image")
-                        
-                        # Check resolution for all providers
-                        actual_res, is_match = check_image_resolution(image, resolution)
-                        if not is_match:
-                            logger.warning(f"Resolution mismatch for page {page_index}: requested {resolution}, got {actual_res}")
-                        
-                        # 优化：直接在子线程中计算版本号并保存到最终位置
-                        # 每个页面独立，使用数据库事务保证版本号原子性，避免临时文件
-                        image_path, next_version = save_image_with_version(
-                            image, project_id, page_id, file_service, page_obj=page_obj
-                        )
-                        
-                        return (page_id, image_path, None, not is_match)
-                        
-                    except Exception as e:
-                        import traceback
-                        error_detail = traceback.format_exc()
-                        logger.error(f"Failed to generate image for page {page_id}: {error_detail}")
-                        return (page_id, None, str(e), None)
-            
-            # Use ThreadPoolExecutor for parallel generation
-            # 关键：提前提取 page.id，不要传递 ORM 对象到子线程
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [
-                    executor.submit(
-                        generate_single_image, page.id,
-                        pages_data_by_index.get(page.order_index, {}), i
+                # 工作线程复用长期保留的应用上下文，不再每页推入/弹出一次
+                _ensure_worker_app_context(app)
+                try:
+                    logger.debug(f"Starting image generation for page {page_id}, index {page_index}")
+                    # Get page from database in this thread
+                    page_obj = Page.query.get(page_id)
+                    if not page_obj:
+                        raise ValueError(f"Page {page_id} not found")
+                    
+                    # Get description content
+                    desc_content = page_obj.get_description_content()
+                    if not desc_content:
+                        raise ValueError("No description content for page")
+                    
+                    # 获取描述文本（可能是 text 字段或 text_content 数组）
+                    desc_text = desc_content.get('text', '')
+                    if not desc_text and desc_content.get('text_content'):
+                        # 如果 text 字段不存在，尝试从 text_content 数组获取
+                        text_content = desc_content.get('text_content', [])
+                        if isinstance(text_content, list):
+                            desc_text = '\n'.join(text_content)
+                        else:
+                            desc_text = str(text_content)
+                    
+                    logger.debug(f"Got description text for page {page_id}: {desc_text[:100]}...")
+                    
+                    # 从当前页面的描述内容中提取图片 URL
+                    page_additional_ref_images = []
+                    has_material_images = False
+                    
+                    # 从描述文本中提取图片
+                    if desc_text:
+                        image_urls = ai_service.extract_image_urls_from_markdown(desc_text)
+                        if image_urls:
+                            logger.info(f"Found {len(image_urls)} image(s) in page {page_id} description")
+                            page_additional_ref_images = image_urls
+                            has_material_images = True
+                    
+                    # 在子线程中动态获取模板路径，确保使用最新模板
+                    page_ref_image_path = None
+                    if use_template:
+                        page_ref_image_path = get_template_path()
+                        # 注意：如果有风格描述，即使没有模板图片也允许生成
+                        # 这个检查已经在 controller 层完成，这里不再检查
+                    
+                    # Generate image prompt
+                    prompt = ai_service.generate_image_prompt(
+                        outline, page_data, desc_text, page_index,
+                        has_material_images=has_material_images,
+                        extra_requirements=extra_requirements,
+                        language=language,
+                        has_template=use_template
                     )
-                    for i, page in enumerate(pages, 1)
-                ]
-                
-                # Process results as they complete
-                for future in as_completed(futures):
-                    page_id, image_path, error, is_mismatched = future.result()
+                    logger.debug(f"Generated image prompt for page {page_id}")
+                    
+                    # Generate image
+                    logger.info(f"🎨 Calling AI service to generate image for page {page_index}/{len(pages)}...")
+                    image = ai_service.generate_image(
+                        prompt, page_ref_image_path, aspect_ratio, resolution,
+                        additional_ref_images=page_additional_ref_images if page_additional_ref_images else None
+                    )
+                    logger.info(f"✅ Image generated successfully for page {page_index}")
                     
-                    if is_mismatched:
-                        resolution_mismatched += 1
+                    if not image:
+                        raise ValueError("Failed to generate image")
                     
-                    db.session.expire_all()
+                    # Check resolution for all providers
+                    actual_res = get_resolution_category(image)
+                    is_match = actual_res == expected_res
+                    if not is_match:
+                        logger.warning(f"Resolution mismatch for page {page_index}: requested {resolution}, got {actual_res}")
                     
-                    # Update page in database (主要是为了更新失败状态)
-                    page = Page.query.get(page_id)
-                    if page:
-                        if error:
-                            page.status = 'FAILED'
-                            failed += 1
-                            db.session.commit()
-                        else:
-                            # 图片已在子线程中保存并创建版本记录，这里只需要更新计数
-                            completed += 1
-                            # 刷新页面对象以获取最新状态
-                            db.session.refresh(page)
+                    # 子线程按带任务 ID 的临时文件名保存，版本号在主线程批量写库时分配，
+                    # 届时再把文件改名为正式版本文件
+                    image_path, cached_image_path = _save_image_files(
+                        image, project_id, _staged_image_key(page_id, task_id), file_service, 0
+                    )
+                    saved_image = {
+                        'page_id': page_id,
+                        'project_id': project_id,
+                        'image_path': image_path,
+                        'cached_image_path': cached_image_path,
+                    }
                     
-                    # Update task progress
-                    task = Task.query.get(task_id)
-                    if task:
-                        progress = task.get_progress()
-                        progress['completed'] = completed
-                        progress['failed'] = failed
-                        # 第一次检测到不匹配时设置警告
-                        if resolution_mismatched > 0 and 'warning_message' not in progress:
-                            progress['warning_message'] = "图片返回分辨率与设置不符，建议使用gemini格式以避免此问题"
-                        task.set_progress(progress)
-                        db.session.commit()
-                        logger.info(f"Image Progress: {completed}/{len(pages)} pages completed")
+                    return (page_id, saved_image, None, not is_match)
+                    
+                except Exception as e:
+                    logger.exception(f"Failed to generate image for page {page_id}")
+                    return (page_id, None, str(e), None)
+                finally:
+                    # 上下文跨页复用，每页结束后释放数据库会话，避免下一页读到旧数据
+                    db.session.remove()
             
-            # Mark task as completed
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'COMPLETED'
-                task.completed_at = datetime.utcnow()
-                if resolution_mismatched > 0:
-                    logger.warning(f"Task {task_id} has {resolution_mismatched} resolution mismatches")
-                db.session.commit()
-                logger.info(f"Task {task_id} COMPLETED - {completed} images generated, {failed} failed")
+            # Use the shared AI pool for parallel generation
+            # 关键：提前提取 page.id，不要传递 ORM 对象到子线程
+            futures = run_in_ai_pool(
+                generate_single_image,
+                (
+                    (page.id, pages_data_by_index.get(page.order_index, {}), i)
+                    for i, page in enumerate(pages, 1)
+                ),
+                max_workers
+            )
+            
+            # 复用任务开始时已加载的页面和任务对象，不再按 id 逐个查询
+            pages_by_id = {page.id: page for page in pages}
+            
+            # 已保存但尚未写入数据库的图片，随进度一起批量写入
+            pending_versions = []
+            
+            def write_progress(commit=True):
+                """写入任务进度，并一起提交期间累积的图片版本和页面失败状态"""
+                _bulk_save_image_versions(pending_versions, file_service)
+                pending_versions.clear()
+                progress['completed'] = completed
+                progress['failed'] = failed
+                # 第一次检测到不匹配时设置警告
+                if resolution_mismatched > 0 and 'warning_message' not in progress:
+                    progress['warning_message'] = "图片返回分辨率与设置不符，建议使用gemini格式以避免此问题"
+                _write_task_progress(task_id, progress)
+                if commit:
+                    db.session.commit()
+                logger.info(f"Image Progress: {completed}/{len(pages)} pages completed")
+            
+            # 进度写入节流：两次写入至少间隔 PROGRESS_WRITE_INTERVAL 秒，循环结束后补写最后一次
+            last_progress_write = time.monotonic()
+            progress_dirty = False
+            
+            # Process results as they complete
+            for future in futures:
+                page_id, saved_image, error, is_mismatched = future.result()
+                
+                if is_mismatched:
+                    resolution_mismatched += 1
+                
+                # Update page in database (主要是为了更新失败状态)
+                page = pages_by_id.get(page_id)
+                if page:
+                    if error:
+                        page.status = 'FAILED'
+                        failed += 1
+                    else:
+                        # 图片文件已在子线程中保存，这里只记录待写入的版本
+                        pending_versions.append(saved_image)
+                        completed += 1
+                progress_dirty = True
+                
+                # Update task progress
+                now = time.monotonic()
+                if now - last_progress_write >= PROGRESS_WRITE_INTERVAL:
+                    write_progress()
+                    last_progress_write = now
+                    progress_dirty = False
+            
+            if progress_dirty:
+                # 最后一批与任务终态一起提交
+                write_progress(commit=False)
+            
+            # Mark task as completed（与项目状态在同一事务中提交）
+            _finalize_task(task_id, 'COMPLETED')
+            if resolution_mismatched > 0:
+                logger.warning(f"Task {task_id} has {resolution_mismatched} resolution mismatches")
             
             # Update project status
-            from models import Project
             project = Project.query.get(project_id)
             if project and failed == 0:
                 project.status = 'COMPLETED'
-                db.session.commit()
+            db.session.commit()
+            logger.info(f"Task {task_id} COMPLETED - {completed} images generated, {failed} failed")
+            if project and failed == 0:
                 logger.info(f"Project {project_id} status updated to COMPLETED")
         
         except Exception as e:
+            # 丢弃未提交的部分写入；尚未写入结果的页面（含已取消和已生成未落库的页面）不能一直停留在 GENERATING
+            db.session.rollback()
+            if generating_page_ids:
+                db.session.execute(
+                    update(Page)
+                    .where(Page.id.in_(generating_page_ids), Page.status == 'GENERATING')
+                    .values(status='FAILED')
+                )
             # Mark task as failed
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'FAILED'
-                task.error_message = str(e)
-                task.completed_at = datetime.utcnow()
-                db.session.commit()
+            _finalize_task(task_id, 'FAILED', error_message=str(e))
+            db.session.commit()
+        finally:
+            # 失败时已生成但未写入数据库的图片仍是临时文件，不再有机会改名，直接删除
+            _remove_staged_image_files(project_id, task_id, file_service)
 
 
 def generate_single_page_image_task(task_id: str, project_id: str, page_id: str, 
@@ -527,19 +820,15 @@ def generate_single_page_image_task(task_id: str, project_id: str, page_id: str,
     with app.app_context():
         try:
             # Update task status to PROCESSING
-            task = Task.query.get(task_id)
-            if not task:
+            if not _mark_task_processing(task_id):
                 return
             
-            task.status = 'PROCESSING'
-            db.session.commit()
-            
             # Get page from database
             page = Page.query.get(page_id)
             if not page or page.project_id != project_id:
                 raise ValueError(f"Page {page_id} not found")
             
-            # Update page status
+            # Update page status（与任务 PROCESSING 状态一起提交）
             page.status = 'GENERATING'
             db.session.commit()
             
@@ -604,9 +893,7 @@ def generate_single_page_image_task(task_id: str, project_id: str, page_id: str,
             )
             
             # Mark task as completed
-            task.status = 'COMPLETED'
-            task.completed_at = datetime.utcnow()
-            task.set_progress({
+            _finalize_task(task_id, 'COMPLETED', progress={
                 "total": 1,
                 "completed": 1,
                 "failed": 0
@@ -616,23 +903,14 @@ def generate_single_page_image_task(task_id: str, project_id: str, page_id: str,
             logger.info(f"✅ Task {task_id} COMPLETED - Page {page_id} image generated")
         
         except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            logger.error(f"Task {task_id} FAILED: {error_detail}")
+            logger.exception(f"Task {task_id} FAILED")
             
-            # Mark task as failed
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'FAILED'
-                task.error_message = str(e)
-                task.completed_at = datetime.utcnow()
-                db.session.commit()
-            
-            # Update page status
+            # Mark task and page as failed（一次提交）
+            _finalize_task(task_id, 'FAILED', error_message=str(e))
             page = Page.query.get(page_id)
             if page:
                 page.status = 'FAILED'
-                db.session.commit()
+            db.session.commit()
 
 
 def edit_page_image_task(task_id: str, project_id: str, page_id: str,
@@ -652,13 +930,9 @@ def edit_page_image_task(task_id: str, project_id: str, page_id: str,
     with app.app_context():
         try:
             # Update task status to PROCESSING
-            task = Task.query.get(task_id)
-            if not task:
+            if not _mark_task_processing(task_id):
                 return
             
-            task.status = 'PROCESSING'
-            db.session.commit()
-            
             # Get page from database
             page = Page.query.get(page_id)
             if not page or page.project_id != project_id:
@@ -667,7 +941,7 @@ def edit_page_image_task(task_id: str, project_id: str, page_id: str,
             if not page.generated_image_path:
                 raise ValueError("Page must have generated image first")
             
-            # Update page status
+            # Update page status（与任务 PROCESSING 状态一起提交）
             page.status = 'GENERATING'
             db.session.commit()
             
@@ -688,11 +962,8 @@ def edit_page_image_task(task_id: str, project_id: str, page_id: str,
             finally:
                 # Clean up temp directory if created
                 if temp_dir:
-                    import shutil
-                    from pathlib import Path
-                    temp_path = Path(temp_dir)
-                    if temp_path.exists():
-                        shutil.rmtree(temp_dir)
+                    _remove_temp_dir_async(temp_dir)
+                    temp_dir = None  # 已提交清理，异常分支不再重复提交
             
             if not image:
                 raise ValueError("Failed to edit image")
@@ -703,9 +974,7 @@ def edit_page_image_task(task_id: str, project_id: str, page_id: str,
             )
             
             # Mark task as completed
-            task.status = 'COMPLETED'
-            task.completed_at = datetime.utcnow()
-            task.set_progress({
+            _finalize_task(task_id, 'COMPLETED', progress={
                 "total": 1,
                 "completed": 1,
                 "failed": 0
@@ -715,31 +984,18 @@ def edit_page_image_task(task_id: str, project_id: str, page_id: str,
             logger.info(f"✅ Task {task_id} COMPLETED - Page {page_id} image edited")
         
         except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            logger.error(f"Task {task_id} FAILED: {error_detail}")
+            logger.exception(f"Task {task_id} FAILED")
             
             # Clean up temp directory on error
             if temp_dir:
-                import shutil
-                from pathlib import Path
-                temp_path = Path(temp_dir)
-                if temp_path.exists():
-                    shutil.rmtree(temp_dir)
+                _remove_temp_dir_async(temp_dir)
             
-            # Mark task as failed
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'FAILED'
-                task.error_message = str(e)
-                task.completed_at = datetime.utcnow()
-                db.session.commit()
-            
-            # Update page status
+            # Mark task and page as failed（一次提交）
+            _finalize_task(task_id, 'FAILED', error_message=str(e))
             page = Page.query.get(page_id)
             if page:
                 page.status = 'FAILED'
-                db.session.commit()
+            db.session.commit()
 
 
 def generate_material_image_task(task_id: str, project_id: str, prompt: str,
@@ -763,11 +1019,8 @@ def generate_material_image_task(task_id: str, project_id: str, prompt: str,
     with app.app_context():
         try:
             # Update task status to PROCESSING
-            task = Task.query.get(task_id)
-            if not task:
+            if not _mark_task_processing(task_id):
                 return
-            
-            task.status = 'PROCESSING'
             db.session.commit()
             
             # Generate image (复用核心逻辑)
@@ -802,11 +1055,10 @@ def generate_material_image_task(task_id: str, project_id: str, prompt: str,
                 url=image_url
             )
             db.session.add(material)
+            db.session.flush()  # 生成 material.id，写入任务进度
             
             # Mark task as completed
-            task.status = 'COMPLETED'
-            task.completed_at = datetime.utcnow()
-            task.set_progress({
+            _finalize_task(task_id, 'COMPLETED', progress={
                 "total": 1,
                 "completed": 1,
                 "failed": 0,
@@ -818,25 +1070,16 @@ def generate_material_image_task(task_id: str, project_id: str, prompt: str,
             logger.info(f"✅ Task {task_id} COMPLETED - Material {material.id} generated")
         
         except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            logger.error(f"Task {task_id} FAILED: {error_detail}")
+            logger.exception(f"Task {task_id} FAILED")
             
             # Mark task as failed
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'FAILED'
-                task.error_message = str(e)
-                task.completed_at = datetime.utcnow()
-                db.session.commit()
+            _finalize_task(task_id, 'FAILED', error_message=str(e))
+            db.session.commit()
         
         finally:
             # Clean up temp directory
             if temp_dir:
-                import shutil
-                temp_path = Path(temp_dir)
-                if temp_path.exists():
-                    shutil.rmtree(temp_dir, ignore_errors=True)
+                _remove_temp_dir_async(temp_dir)
 
 
 def process_ppt_renovation_task(task_id: str, project_id: str, ai_service,
@@ -872,15 +1115,11 @@ def process_ppt_renovation_task(task_id: str, project_id: str, ai_service,
 
     with app.app_context():
         try:
-            task = Task.query.get(task_id)
-            if not task:
+            if not _mark_task_processing(task_id):
                 logger.error(f"Task {task_id} not found")
                 return
-
-            task.status = 'PROCESSING'
             db.session.commit()
 
-            from models import Project
             project = Project.query.get(project_id)
             if not project:
                 raise ValueError(f"Project {project_id} not found")
@@ -889,138 +1128,173 @@ def process_ppt_renovation_task(task_id: str, project_id: str, ai_service,
             pdf_path = None
             project_dir = Path(app.config['UPLOAD_FOLDER']) / project_id
             # Look for the uploaded PDF file
-            for f in (project_dir / "template").iterdir() if (project_dir / "template").exists() else []:
-                if f.suffix.lower() == '.pdf':
-                    pdf_path = str(f)
-                    break
+            template_dir = project_dir / "template"
+            if template_dir.is_dir():
+                with os.scandir(template_dir) as entries:
+                    for entry in entries:
+                        if entry.name.lower().endswith('.pdf') and entry.is_file():
+                            pdf_path = entry.path
+                            break
 
             if not pdf_path:
                 raise ValueError("No PDF file found for renovation project")
 
             # Step 1: Split PDF into per-page PDFs
             split_dir = str(project_dir / "split_pages")
-            page_pdfs = split_pdf_to_pages(pdf_path, split_dir)
-            logger.info(f"Split PDF into {len(page_pdfs)} pages")
+            # 按需逐页拆分：前几页拆出后即可开始解析，不必等整份 PDF 拆分完成
+            pdf_page_count, page_pdfs = iter_split_pdf_pages(pdf_path, split_dir)
+            logger.info(f"PDF has {pdf_page_count} pages")
 
             # Get existing pages
             pages = Page.query.filter_by(project_id=project_id).order_by(Page.order_index).all()
 
             # Ensure page count matches
-            if len(pages) != len(page_pdfs):
-                logger.warning(f"Page count mismatch: {len(pages)} pages vs {len(page_pdfs)} PDFs. Using min.")
-            page_count = min(len(pages), len(page_pdfs))
+            if len(pages) != pdf_page_count:
+                logger.warning(f"Page count mismatch: {len(pages)} pages vs {pdf_page_count} PDFs. Using min.")
+            page_count = min(len(pages), pdf_page_count)
             if page_count == 0:
                 raise ValueError("No pages to process")
 
-            task.set_progress({
+            # 进度字典保留在内存中，之后直接写库
+            progress = {
                 "total": page_count,
                 "completed": 0,
                 "failed": 0,
                 "current_step": "parsing"
-            })
+            }
+            _write_task_progress(task_id, progress)
             db.session.commit()
+            # 在主线程中一次性取出子线程需要的页面字段，子线程不访问主线程会话中的 ORM 对象
+            page_ids = [page.id for page in pages[:page_count]]
+            # keep_layout 时需要的页面图片绝对路径，同样预先解析并检查存在性
+            page_image_paths = [None] * page_count
+            if keep_layout:
+                for i, page in enumerate(pages[:page_count]):
+                    relative_path = page.cached_image_path or page.generated_image_path
+                    if relative_path:
+                        image_path = file_service.get_absolute_path(relative_path)
+                        if os.path.isfile(image_path):
+                            page_image_paths[i] = image_path
 
             # Process each page as an independent pipeline:
             # parse markdown → AI extract content → (optional layout caption) → write to DB
             logger.info("Processing pages (parse → extract → save pipeline)...")
-            import threading
-            progress_lock = threading.Lock()
             completed = 0
             failed = 0
             extraction_errors = []
             content_results = {}  # index -> {title, points, description}
 
+            # 任一页失败整个任务即失败（fail-fast），置位后仍在执行的页面在步骤之间提前退出
+            abort_event = threading.Event()
+
             def process_single_page(idx, page_pdf_path):
-                nonlocal completed, failed
-                with app.app_context():
-                    try:
-                        # Step A: Parse page PDF → markdown
-                        filename = os.path.basename(page_pdf_path)
-                        _batch_id, md_text, extract_id, error_msg, _failed = file_parser_service.parse_file(page_pdf_path, filename)
-                        if error_msg:
-                            logger.warning(f"Page {idx} parse warning: {error_msg}")
-                        md_text = md_text or ''
-
-                        # Supplement with header/footer from layout.json
-                        if extract_id:
-                            hf_text = file_parser_service.extract_header_footer_from_layout(extract_id)
-                            if hf_text:
-                                md_text = hf_text + '\n\n' + md_text
-
-                        if not md_text.strip():
-                            content = {'title': f'Page {idx + 1}', 'points': [], 'description': ''}
-                            error = 'empty_input'
-                        else:
-                            # Step B: AI extract structured content
-                            content = ai_service.extract_page_content(md_text, language=language)
-                            error = None
-
-                        # Step C: Optional layout caption
-                        if keep_layout and not error:
-                            try:
-                                page_obj = pages[idx] if idx < len(pages) else None
-                                if page_obj:
-                                    image_path = None
-                                    if page_obj.cached_image_path:
-                                        image_path = file_service.get_absolute_path(page_obj.cached_image_path)
-                                    elif page_obj.generated_image_path:
-                                        image_path = file_service.get_absolute_path(page_obj.generated_image_path)
-                                    if image_path and Path(image_path).exists():
-                                        caption = ai_service.generate_layout_caption(image_path)
-                                        if caption:
-                                            content['description'] += f"\n\n{caption}"
-                            except Exception as e:
-                                logger.error(f"Layout caption failed for page {idx}: {e}")
-
-                        # Step D: Write to DB immediately
-                        content_results[idx] = content
-                        page_obj = Page.query.get(pages[idx].id)
-                        if page_obj:
-                            title = content.get('title', f'Page {idx + 1}')
-                            points = content.get('points', [])
-                            description = content.get('description', '')
-
-                            page_obj.set_outline_content({
-                                'title': title,
-                                'points': points
-                            })
-                            page_obj.set_description_content({
-                                "text": description,
-                                "generated_at": datetime.utcnow().isoformat()
-                            })
-                            page_obj.status = 'DESCRIPTION_GENERATED'
-                            db.session.commit()
-
-                        with progress_lock:
-                            if error and error != 'empty_input':
-                                failed += 1
-                                extraction_errors.append(error)
-                            else:
-                                completed += 1
-                            task_obj = Task.query.get(task_id)
-                            if task_obj:
-                                task_obj.update_progress(completed=completed, failed=failed)
-                                db.session.commit()
-
-                        logger.info(f"Page {idx} pipeline done (completed={completed}, failed={failed})")
-
-                    except Exception as e:
-                        logger.error(f"Pipeline failed for page {idx}: {e}")
-                        with progress_lock:
-                            failed += 1
-                            extraction_errors.append(str(e))
-                            task_obj = Task.query.get(task_id)
-                            if task_obj:
-                                task_obj.update_progress(completed=completed, failed=failed)
-                                db.session.commit()
-
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [
-                    executor.submit(process_single_page, i, page_pdfs[i])
-                    for i in range(page_count)
-                ]
-                for future in as_completed(futures):
-                    future.result()  # propagate any unexpected exceptions
+                """返回 (idx, content, error)，数据库写入由主线程批量完成"""
+                if abort_event.is_set():
+                    return (idx, None, 'aborted')
+                # 工作线程复用长期保留的应用上下文
+                _ensure_worker_app_context(app)
+                try:
+                    # Step A: Parse page PDF → markdown (supplemented with header/footer from layout.json)
+                    filename = os.path.basename(page_pdf_path)
+                    _batch_id, md_text, _extract_id, error_msg, _failed = file_parser_service.parse_file_with_header_footer(page_pdf_path, filename)
+                    if error_msg:
+                        logger.warning(f"Page {idx} parse warning: {error_msg}")
+                    md_text = md_text or ''
+
+                    if not md_text.strip():
+                        content = {'title': f'Page {idx + 1}', 'points': [], 'description': ''}
+                        error = 'empty_input'
+                    elif abort_event.is_set():
+                        return (idx, None, 'aborted')
+                    else:
+                        # Step B: AI extract structured content
+                        content = ai_service.extract_page_content(md_text, language=language)
+                        error = None
+
+                    # Step C: Optional layout caption
+                    if keep_layout and not error and not abort_event.is_set():
+                        try:
+                            image_path = page_image_paths[idx]
+                            if image_path:
+                                caption = ai_service.generate_layout_caption(image_path)
+                                if caption:
+                                    content['description'] += f"\n\n{caption}"
+                        except Exception as e:
+                            logger.error(f"Layout caption failed for page {idx}: {e}")
+
+                    return (idx, content, error)
+
+                except Exception as e:
+                    logger.error(f"Pipeline failed for page {idx}: {e}")
+                    return (idx, None, str(e))
+                finally:
+                    # 共享线程池的上下文跨页复用，每页结束后释放数据库会话
+                    db.session.remove()
+
+            # 在共享 AI 线程池中执行，本任务最多同时占用 max_workers 个线程
+            # 每页的解析和提取都是网络等待（MinerU、AI 服务），本地 Python 处理（markdown 图片路径替换、
+            # 图片描述拼接）每页不到 1ms，线程等待网络时释放 GIL，不需要改用进程池
+            futures = run_in_ai_pool(
+                process_single_page,
+                zip(range(page_count), page_pdfs),
+                max_workers
+            )
+
+            # 结果先在内存中累积，每 DESCRIPTION_COMMIT_BATCH_SIZE 页（以及最后一批）统一写库并提交一次
+            page_updates = []
+            processed_since_flush = 0
+
+            def flush_pending(commit=True):
+                nonlocal processed_since_flush
+                if page_updates:
+                    # 按主键批量更新本批页面（ORM bulk UPDATE）
+                    db.session.execute(update(Page), page_updates)
+                    page_updates.clear()
+                # Update task progress（与页面更新在同一事务中提交）
+                progress['completed'] = completed
+                progress['failed'] = failed
+                _write_task_progress(task_id, progress)
+                if commit:
+                    db.session.commit()
+                processed_since_flush = 0
+
+            for future in futures:
+                idx, content, error = future.result()  # propagate any unexpected exceptions
+                if error == 'aborted':
+                    continue
+                if content is not None:
+                    content_results[idx] = content
+                    page_updates.append({
+                        'id': page_ids[idx],
+                        'outline_content': Page.serialize_json({
+                            'title': content.get('title', f'Page {idx + 1}'),
+                            'points': content.get('points', [])
+                        }),
+                        'description_content': Page.serialize_json({
+                            "text": content.get('description', ''),
+                            "generated_at": datetime.utcnow().isoformat()
+                        }),
+                        'status': 'DESCRIPTION_GENERATED',
+                    })
+
+                if error and error != 'empty_input':
+                    failed += 1
+                    extraction_errors.append(error)
+                else:
+                    completed += 1
+                logger.info(f"Page {idx} pipeline done (completed={completed}, failed={failed})")
+
+                processed_since_flush += 1
+                if failed:
+                    # Fail-fast：停止提交剩余页面，取消排队中的调用，并通知执行中的页面提前退出
+                    abort_event.set()
+                    futures.close()
+                    break
+                if processed_since_flush >= DESCRIPTION_COMMIT_BATCH_SIZE:
+                    flush_pending()
+            if processed_since_flush:
+                # 最后一批与任务终态（或失败状态）一起提交
+                flush_pending(commit=False)
 
             logger.info(f"All pages processed: {completed} completed, {failed} failed")
 
@@ -1032,51 +1306,38 @@ def process_ppt_renovation_task(task_id: str, project_id: str, ai_service,
             # Update project-level aggregated text
             project = Project.query.get(project_id)
             if project:
-                all_outlines = []
-                all_descriptions = []
+                # 逐页直接写入缓冲区，不再为每页文本块构建中间列表
+                outline_buf = io.StringIO()
+                description_buf = io.StringIO()
                 for i in range(page_count):
                     content = content_results.get(i, {})
-                    title = content.get('title', '')
-                    points = content.get('points', [])
-                    description = content.get('description', '')
-                    header = f"第{i + 1}页：{title}"
-                    if points:
-                        all_outlines.append(f"{header}\n" + "\n".join(f"- {p}" for p in points))
-                    else:
-                        all_outlines.append(header)
-                    all_descriptions.append(f"--- 第{i + 1}页 ---\n{description}")
-                project.outline_text = "\n\n".join(all_outlines)
-                project.description_text = "\n\n".join(all_descriptions)
+                    if i > 0:
+                        outline_buf.write("\n\n")
+                        description_buf.write("\n\n")
+                    outline_buf.write(f"第{i + 1}页：{content.get('title', '')}")
+                    for point in content.get('points') or []:
+                        outline_buf.write(f"\n- {point}")
+                    description_buf.write(f"--- 第{i + 1}页 ---\n{content.get('description', '')}")
+                project.outline_text = outline_buf.getvalue()
+                project.description_text = description_buf.getvalue()
                 project.status = 'DESCRIPTIONS_GENERATED'
                 project.updated_at = datetime.utcnow()
 
+            # Mark task as completed（与项目内容在同一事务中提交）
+            _finalize_task(task_id, 'COMPLETED', progress={
+                "total": page_count,
+                "completed": completed,
+                "failed": failed,
+                "current_step": "done"
+            })
             db.session.commit()
 
-            # Mark task as completed
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'COMPLETED'
-                task.completed_at = datetime.utcnow()
-                task.set_progress({
-                    "total": page_count,
-                    "completed": completed,
-                    "failed": failed,
-                    "current_step": "done"
-                })
-                db.session.commit()
-
             logger.info(f"Task {task_id} COMPLETED - PPT renovation processed {page_count} pages")
 
         except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            logger.error(f"Task {task_id} FAILED: {error_detail}")
+            logger.exception(f"Task {task_id} FAILED")
 
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'FAILED'
-                task.error_message = str(e)
-                task.completed_at = datetime.utcnow()
+            _finalize_task(task_id, 'FAILED', error_message=str(e))
 
             # Reset project status so user can retry
             project = Project.query.get(project_id)
@@ -1127,11 +1388,6 @@ def export_editable_pptx_with_recursive_analysis_task(
         raise ValueError("Flask app instance must be provided")
     
     with app.app_context():
-        import os
-        from datetime import datetime
-        from PIL import Image
-        from models import Project
-        from services.export_service import ExportService, ExportError
 
         logger.info(f"开始递归分析导出任务 {task_id} for project {project_id}")
 
@@ -1146,19 +1402,20 @@ def export_editable_pptx_with_recursive_analysis_task(
             fail_fast = not export_allow_partial
             logger.info(f"导出设置: export_allow_partial={export_allow_partial}, fail_fast={fail_fast}")
 
-            # IMPORTANT: Expire cached objects to ensure fresh data from database
-            # This prevents reading stale generated_image_path after page regeneration
-            db.session.expire_all()
-
             # Get pages (filtered by page_ids if provided)
-            pages = get_filtered_pages(project_id, page_ids)
-            if not pages:
+            # 只查询需要的图片路径列（不经过 ORM 对象和 identity map），每次都直接读取数据库中的最新值，
+            # 不会读到页面重新生成之前的旧 generated_image_path
+            page_query = db.session.query(Page.generated_image_path).filter(Page.project_id == project_id)
+            if page_ids:
+                page_query = page_query.filter(Page.id.in_(page_ids))
+            generated_image_paths = [row.generated_image_path for row in page_query.order_by(Page.order_index)]
+            if not generated_image_paths:
                 raise ValueError('No pages found for project')
             
             image_paths = []
-            for page in pages:
-                if page.generated_image_path:
-                    img_path = file_service.get_absolute_path(page.generated_image_path)
+            for generated_image_path in generated_image_paths:
+                if generated_image_path:
+                    img_path = file_service.get_absolute_path(generated_image_path)
                     if os.path.exists(img_path):
                         image_paths.append(img_path)
             
@@ -1168,8 +1425,7 @@ def export_editable_pptx_with_recursive_analysis_task(
             logger.info(f"找到 {len(image_paths)} 张图片")
             
             # 初始化任务进度（包含消息日志）
-            task = Task.query.get(task_id)
-            task.set_progress({
+            _write_task_progress(task_id, {
                 "total": 100,  # 使用百分比
                 "completed": 0,
                 "failed": 0,
@@ -1180,32 +1436,32 @@ def export_editable_pptx_with_recursive_analysis_task(
             db.session.commit()
             
             # 进度回调函数 - 更新数据库中的进度
-            progress_messages = ["🚀 开始导出可编辑PPTX..."]
             max_messages = 10  # 最多保留最近10条消息
+            progress_messages = deque(["🚀 开始导出可编辑PPTX..."], maxlen=max_messages)
+            # 进度写入节流：进入新步骤时立即写入，同一步骤内两次写入至少间隔 PROGRESS_WRITE_INTERVAL 秒
+            last_progress = {'step': None, 'written_at': 0.0}
             
             def progress_callback(step: str, message: str, percent: int):
                 """更新任务进度到数据库"""
-                nonlocal progress_messages
+                # 添加新消息到日志（deque 自动只保留最近的消息）
+                progress_messages.append(f"[{step}] {message}")
+                
+                now = time.monotonic()
+                if step == last_progress['step'] and now - last_progress['written_at'] < PROGRESS_WRITE_INTERVAL:
+                    return
                 try:
-                    # 添加新消息到日志
-                    new_message = f"[{step}] {message}"
-                    progress_messages.append(new_message)
-                    # 只保留最近的消息
-                    if len(progress_messages) > max_messages:
-                        progress_messages = progress_messages[-max_messages:]
-                    
                     # 更新数据库
-                    task = Task.query.get(task_id)
-                    if task:
-                        task.set_progress({
-                            "total": 100,
-                            "completed": percent,
-                            "failed": 0,
-                            "current_step": message,
-                            "percent": percent,
-                            "messages": progress_messages.copy()
-                        })
-                        db.session.commit()
+                    _write_task_progress(task_id, {
+                        "total": 100,
+                        "completed": percent,
+                        "failed": 0,
+                        "current_step": message,
+                        "percent": percent,
+                        "messages": list(progress_messages)
+                    })
+                    db.session.commit()
+                    last_progress['step'] = step
+                    last_progress['written_at'] = now
                 except Exception as e:
                     logger.warning(f"更新进度失败: {e}")
             
@@ -1229,18 +1485,16 @@ def export_editable_pptx_with_recursive_analysis_task(
                 output_path = os.path.join(exports_dir, filename)
                 logger.info(f"文件名冲突，使用新文件名: {filename}")
             
-            # 获取第一张图片的尺寸作为参考
-            first_img = Image.open(image_paths[0])
-            slide_width, slide_height = first_img.size
-            first_img.close()
+            # 获取第一张图片的尺寸作为参考（Image.open 只解析文件头，不解码像素）
+            with Image.open(image_paths[0]) as first_img:
+                slide_width, slide_height = first_img.size
             
             logger.info(f"幻灯片尺寸: {slide_width}x{slide_height}")
             logger.info(f"递归深度: {max_depth}, 并发数: {max_workers}")
             progress_callback("准备", f"幻灯片尺寸: {slide_width}×{slide_height}", 3)
             
             # Step 2: 创建文字属性提取器
-            from services.image_editability import TextAttributeExtractorFactory
-            text_attribute_extractor = TextAttributeExtractorFactory.create_caption_model_extractor()
+            text_attribute_extractor = _get_caption_extractor(get_ai_service())
             progress_callback("准备", "文字属性提取器已初始化", 5)
             
             # Step 3: 调用导出方法（使用项目的导出设置）
@@ -1266,7 +1520,8 @@ def export_editable_pptx_with_recursive_analysis_task(
             # Step 4: 标记任务完成
             download_path = f"/files/{project_id}/exports/{filename}"
             
-            # 添加完成消息
+            # 添加完成消息（完成消息和警告不受最近消息条数限制）
+            progress_messages = list(progress_messages)
             progress_messages.append("✅ 导出完成！")
             
             # 添加警告信息（如果有）
@@ -1276,66 +1531,48 @@ def export_editable_pptx_with_recursive_analysis_task(
                 progress_messages.extend(warning_messages)
                 logger.warning(f"导出有 {len(warning_messages)} 条警告")
             
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'COMPLETED'
-                task.completed_at = datetime.utcnow()
-                task.set_progress({
-                    "total": 100,
-                    "completed": 100,
-                    "failed": 0,
-                    "current_step": "✓ 导出完成",
-                    "percent": 100,
-                    "messages": progress_messages,
-                    "download_url": download_path,
-                    "filename": filename,
-                    "method": "recursive_analysis",
-                    "max_depth": max_depth,
-                    "warnings": warning_messages,  # 单独的警告列表
-                    "warning_details": export_warnings.to_dict() if export_warnings else {}  # 详细警告信息
-                })
-                db.session.commit()
-                logger.info(f"✓ 任务 {task_id} 完成 - 递归分析导出成功（深度={max_depth}）")
+            _finalize_task(task_id, 'COMPLETED', progress={
+                "total": 100,
+                "completed": 100,
+                "failed": 0,
+                "current_step": "✓ 导出完成",
+                "percent": 100,
+                "messages": progress_messages,
+                "download_url": download_path,
+                "filename": filename,
+                "method": "recursive_analysis",
+                "max_depth": max_depth,
+                "warnings": warning_messages,  # 单独的警告列表
+                "warning_details": export_warnings.to_dict(max_items=WARNING_DETAILS_MAX_ITEMS) if export_warnings else {}  # 详细警告信息（按类截断）
+            })
+            db.session.commit()
+            logger.info(f"✓ 任务 {task_id} 完成 - 递归分析导出成功（深度={max_depth}）")
 
         except ExportError as e:
             # 导出错误（fail_fast 模式下的详细错误）
-            import traceback
-            error_detail = traceback.format_exc()
             logger.error(f"✗ 任务 {task_id} 导出失败: {e.message}")
             logger.error(f"错误类型: {e.error_type}, 详情: {e.details}")
 
-            # 标记任务失败，包含详细错误信息
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'FAILED'
-                # 构建详细的错误消息
-                error_message = f"{e.message}"
-                if e.help_text:
-                    error_message += f"\n\n💡 {e.help_text}"
-                task.error_message = error_message
-                task.completed_at = datetime.utcnow()
-                # 在 progress 中保存详细错误信息
-                task.set_progress({
-                    "total": 100,
-                    "completed": 0,
-                    "failed": 1,
-                    "current_step": "导出失败",
-                    "percent": 0,
-                    "error_type": e.error_type,
-                    "error_details": e.details,
-                    "help_text": e.help_text
-                })
-                db.session.commit()
+            # 构建详细的错误消息
+            error_message = f"{e.message}"
+            if e.help_text:
+                error_message += f"\n\n💡 {e.help_text}"
+            # 标记任务失败，在 progress 中保存详细错误信息
+            _finalize_task(task_id, 'FAILED', error_message=error_message, progress={
+                "total": 100,
+                "completed": 0,
+                "failed": 1,
+                "current_step": "导出失败",
+                "percent": 0,
+                "error_type": e.error_type,
+                "error_details": e.details,
+                "help_text": e.help_text
+            })
+            db.session.commit()
 
         except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            logger.error(f"✗ 任务 {task_id} 失败: {error_detail}")
+            logger.exception(f"✗ 任务 {task_id} 失败")
             
             # 标记任务失败
-            task = Task.query.get(task_id)
-            if task:
-                task.status = 'FAILED'
-                task.error_message = str(e)
-                task.completed_at = datetime.utcnow()
-                db.session.commit()
+            _finalize_task(task_id, 'FAILED', error_message=str(e))
+            db.session.commit()
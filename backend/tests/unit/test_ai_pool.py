@@ -0,0 +1,69 @@
+"""
+Shared AI call pool tests
+"""
+import threading
+import time
+
+import pytest
+
+from utils.ai_pool import run_in_ai_pool
+
+
+@pytest.mark.unit
+class TestRunInAiPool:
+    """run_in_ai_pool per-task concurrency tests"""
+
+    def test_limits_in_flight_calls_and_returns_all_results(self):
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def work(i):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.005)
+            with lock:
+                state['active'] -= 1
+            return i
+
+        results = [f.result() for f in run_in_ai_pool(work, [(i,) for i in range(30)], 3)]
+        assert sorted(results) == list(range(30))
+        assert state['peak'] <= 3
+
+    def test_empty_input(self):
+        assert list(run_in_ai_pool(lambda: None, [], 4)) == []
+
+    def test_pulls_arguments_lazily(self):
+        pulled = []
+
+        def args():
+            for i in range(100):
+                pulled.append(i)
+                yield (i,)
+
+        results = run_in_ai_pool(lambda i: i, args(), 4)
+        next(results)
+        # 初始窗口 + 首次唤醒时补交的名额
+        assert len(pulled) <= 8
+        assert len(list(results)) == 99
+
+    def test_close_stops_submitting_remaining_arguments(self):
+        pulled = []
+        started = []
+
+        def args():
+            for i in range(100):
+                pulled.append(i)
+                yield (i,)
+
+        def work(i):
+            started.append(i)
+            time.sleep(0.01)
+            return i
+
+        results = run_in_ai_pool(work, args(), 2)
+        next(results)
+        results.close()
+        time.sleep(0.05)
+        assert len(pulled) <= 4
+        assert len(started) <= 4
@@ -0,0 +1,39 @@
+"""
+AI provider setting resolution tests
+"""
+import os
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from services.ai_providers import _resolve_setting
+
+
+@pytest.mark.unit
+class TestResolveSetting:
+    """_resolve_setting priority and alias chain tests"""
+
+    def test_app_config_wins_over_environment(self):
+        app = Flask(__name__)
+        app.config['OPENAI_API_BASE'] = 'https://config'
+        with patch.dict(os.environ, {'OPENAI_API_BASE': 'https://env'}):
+            with app.app_context():
+                assert _resolve_setting('OPENAI_API_BASE') == 'https://config'
+            assert _resolve_setting('OPENAI_API_BASE') == 'https://env'
+
+    def test_first_non_empty_alias_wins(self):
+        app = Flask(__name__)
+        app.config.update(TEXT_API_KEY='', OPENAI_API_KEY=None, GOOGLE_API_KEY='google-key')
+        with patch.dict(os.environ, {}, clear=True):
+            with app.app_context():
+                assert _resolve_setting('TEXT_API_KEY', 'OPENAI_API_KEY', 'GOOGLE_API_KEY') == 'google-key'
+
+    def test_fallback_only_when_last_alias_is_unset(self):
+        app = Flask(__name__)
+        with patch.dict(os.environ, {}, clear=True):
+            with app.app_context():
+                assert _resolve_setting('TEXT_API_BASE', 'OPENAI_API_BASE', fallback='https://default') \
+                    == 'https://default'
+                app.config['OPENAI_API_BASE'] = ''
+                assert _resolve_setting('TEXT_API_BASE', 'OPENAI_API_BASE', fallback='https://default') == ''
@@ -0,0 +1,152 @@
+"""Test ExportService helpers used when building editable PPTX."""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure backend is on path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from services.export_service import ExportService, ExportWarnings, _ImageDataCache
+from services.image_editability.data_models import BBox, EditableElement
+
+PARENT = BBox(0, 0, 10, 10)
+
+
+def _elem(element_id, bbox_global, bbox=None):
+    return EditableElement(
+        element_id=element_id,
+        element_type='text',
+        bbox=bbox or BBox(0, 0, 1, 1),
+        bbox_global=bbox_global,
+    )
+
+
+class TestFindDominantChild:
+
+    def test_no_children(self):
+        assert ExportService._find_dominant_child([], PARENT, 0.85) == (-1, 0.0)
+
+    def test_zero_parent_area(self):
+        children = [_elem('a', BBox(0, 0, 10, 10))]
+        assert ExportService._find_dominant_child(children, BBox(0, 0, 0, 10), 0.85) == (-1, 0.0)
+
+    def test_small_children_not_dominant(self):
+        children = [_elem('a', BBox(0, 0, 5, 5)), _elem('b', BBox(5, 5, 10, 10))]
+        assert ExportService._find_dominant_child(children, PARENT, 0.85) == (-1, 0.0)
+
+    def test_returns_first_dominant_child(self):
+        children = [
+            _elem('small', BBox(0, 0, 2, 2)),
+            _elem('big', BBox(0, 0, 10, 9)),
+            _elem('bigger', BBox(0, 0, 10, 10)),
+        ]
+        idx, ratio = ExportService._find_dominant_child(children, PARENT, 0.85)
+        assert idx == 1
+        assert abs(ratio - 0.9) < 1e-9
+
+    def test_wide_but_short_child_not_dominant(self):
+        children = [_elem('banner', BBox(0, 0, 10, 2))]
+        assert ExportService._find_dominant_child(children, PARENT, 0.85) == (-1, 0.0)
+
+    def test_threshold_is_exclusive(self):
+        children = [_elem('edge', BBox(0, 0, 10, 8.5))]
+        assert ExportService._find_dominant_child(children, PARENT, 0.85)[0] == -1
+
+    def test_falls_back_to_local_bbox(self):
+        children = [_elem('local', None, bbox=BBox(0, 0, 10, 10))]
+        idx, ratio = ExportService._find_dominant_child(children, PARENT, 0.85)
+        assert idx == 0
+        assert ratio == 1.0
+
+    def test_child_taller_than_parent(self):
+        children = [_elem('tall', BBox(0, 0, 5, 20))]
+        idx, ratio = ExportService._find_dominant_child(children, PARENT, 0.85)
+        assert idx == 0
+        assert ratio == 1.0
+
+    def test_vectorized_child_taller_than_parent(self):
+        children = [_elem(f's{i}', BBox(0, 0, 1, 1)) for i in range(20)]
+        children.append(_elem('tall', BBox(0, 0, 5, 20)))
+        idx, ratio = ExportService._find_dominant_child(children, PARENT, 0.85)
+        assert idx == 20
+        assert ratio == 1.0
+
+    def test_vectorized_path_matches_scalar(self):
+        children = [_elem(f's{i}', BBox(0, 0, 1, 1)) for i in range(20)]
+        children.append(_elem('big', BBox(0, 0, 10, 9.5)))
+        idx, ratio = ExportService._find_dominant_child(children, PARENT, 0.85)
+        assert idx == 20
+        assert abs(ratio - 0.95) < 1e-9
+
+
+class TestReadImageFiles:
+
+    def test_reads_files_and_skips_missing(self, tmp_path):
+        a = tmp_path / 'a.png'
+        a.write_bytes(b'aaa')
+        missing = str(tmp_path / 'missing.png')
+        result = ExportService._read_image_files({str(a), missing})
+        assert result == {str(a): b'aaa'}
+
+    def test_cache_is_reused_across_calls(self, tmp_path):
+        a = tmp_path / 'a.png'
+        a.write_bytes(b'aaa')
+        cache = _ImageDataCache()
+        ExportService._read_image_files({str(a)}, cache)
+        a.unlink()
+        assert ExportService._read_image_files({str(a)}, cache) == {str(a): b'aaa'}
+
+    def test_reads_through_shared_executor(self, tmp_path):
+        paths = []
+        for name in ('a', 'b', 'c'):
+            path = tmp_path / f'{name}.png'
+            path.write_bytes(name.encode())
+            paths.append(str(path))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = ExportService._read_image_files(set(paths[:2]), executor=executor)
+            second = ExportService._read_image_files(set(paths[1:]), executor=executor)
+        assert first == {paths[0]: b'a', paths[1]: b'b'}
+        assert second == {paths[1]: b'b', paths[2]: b'c'}
+
+
+class TestImageDataCache:
+
+    def test_evicts_least_recently_used_beyond_byte_budget(self):
+        cache = _ImageDataCache(max_bytes=10)
+        cache.put('a', b'aaaa')
+        cache.put('b', b'bbbb')
+        assert cache.get('a') == b'aaaa'
+        cache.put('c', b'cccc')
+        assert 'b' not in cache
+        assert cache.get('a') == b'aaaa'
+        assert cache.get('c') == b'cccc'
+
+    def test_skips_entries_larger_than_budget(self):
+        cache = _ImageDataCache(max_bytes=4)
+        cache.put('a', b'aaa')
+        cache.put('big', b'bbbbb')
+        assert 'big' not in cache
+        assert cache.get('a') == b'aaa'
+
+
+class TestExportWarningsToDict:
+
+    def test_unlimited_by_default(self):
+        warnings = ExportWarnings()
+        for i in range(3):
+            warnings.add_style_extraction_failed(f'e{i}', 'boom')
+        details = warnings.to_dict()
+        assert len(details['style_extraction_failed']) == 3
+        assert 'truncated' not in details
+        assert details['total_warnings'] == 3
+
+    def test_max_items_keeps_head_and_records_dropped_counts(self):
+        warnings = ExportWarnings()
+        for i in range(5):
+            warnings.add_style_extraction_failed(f'e{i}', 'boom')
+        warnings.add_warning('only one')
+        details = warnings.to_dict(max_items=2)
+        assert [d['element_id'] for d in details['style_extraction_failed']] == ['e0', 'e1']
+        assert details['other_warnings'] == ['only one']
+        assert details['truncated'] == {'style_extraction_failed': 3}
+        assert details['total_warnings'] == 6
@@ -2,8 +2,12 @@
 Unit tests for FileParserService provider-specific behavior.
 """
 
+import io
+import json
 import os
+import shutil
 import tempfile
+import zipfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -77,3 +81,38 @@ def test_can_generate_captions_accepts_vendor_prefix_key():
             lazyllm_image_caption_source=source,
         )
         assert service._can_generate_captions() is True
+
+
+def _mineru_zip(markdown: str, layout: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as z:
+        z.writestr('full.md', markdown)
+        z.writestr('layout.json', json.dumps(layout))
+    return buffer.getvalue()
+
+
+def test_download_markdown_prepends_header_footer_from_zip():
+    """Header/footer text is taken from the result zip during the same parse."""
+    layout = {'pdf_info': [{'discarded_blocks': [
+        {'type': 'header', 'lines': [{'spans': [{'type': 'text', 'content': 'Company Name'}]}]},
+        {'type': 'footer', 'lines': [{'spans': [{'type': 'text', 'content': 'Page 3'}]}]},
+        {'type': 'page_number', 'lines': [{'spans': [{'type': 'text', 'content': '3'}]}]},
+    ]}]}
+    response = MagicMock(content=_mineru_zip('# Title\n\nBody', layout))
+    service = FileParserService(mineru_token='test-token')
+
+    with patch('services.file_parser_service.get_http_session') as get_session:
+        get_session.return_value.get.return_value = response
+        plain, plain_id, _ = service._download_markdown('https://zip')
+        with_hf, hf_id, error = service._download_markdown('https://zip', include_header_footer=True)
+
+    try:
+        assert error is None
+        assert plain == '# Title\n\nBody'
+        assert with_hf == 'Company Name\nPage 3\n\n# Title\n\nBody'
+        # 与从解压目录读取 layout.json 的结果一致
+        assert FileParserService.extract_header_footer_from_layout(hf_id) == 'Company Name\nPage 3'
+    finally:
+        for extract_id in (plain_id, hf_id):
+            shutil.rmtree(Path(__file__).resolve().parents[3] / 'uploads' / 'mineru_files' / extract_id,
+                          ignore_errors=True)
@@ -0,0 +1,133 @@
+"""
+ImageEditabilityService clean background tests
+"""
+import threading
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from services.image_editability import (
+    BBox, EditableElement, ExtractorRegistry, ImageEditabilityService,
+    InpaintProvider, ServiceConfig,
+)
+from services.image_editability.inpaint_providers import (
+    GenerativeEditInpaintProvider, InpaintProviderRegistry,
+)
+
+
+class _PixelReadingInpaintProvider(InpaintProvider):
+    """Stub provider that touches the pixel data like a real inpaint call"""
+
+    def __init__(self):
+        self.calls = []
+        self.kwargs = []
+
+    def inpaint_regions(self, image, bboxes, types=None, **kwargs):
+        self.calls.append(bboxes)
+        self.kwargs.append(kwargs)
+        result = image.convert('RGB')
+        for x0, y0, x1, y1 in bboxes:
+            result.paste((255, 255, 255), (int(x0), int(y0), int(x1), int(y1)))
+        return result
+
+
+@pytest.fixture
+def service_and_provider(tmp_path):
+    provider = _PixelReadingInpaintProvider()
+    config = ServiceConfig(
+        upload_folder=Path(tmp_path),
+        extractor_registry=ExtractorRegistry(),
+        inpaint_registry=InpaintProviderRegistry().register_default(provider),
+    )
+    return ImageEditabilityService(config), provider
+
+
+@pytest.mark.unit
+class TestGenerateCleanBackground:
+    """_generate_clean_background tests"""
+
+    def test_inpaints_with_open_source_image(self, service_and_provider, tmp_path):
+        service, provider = service_and_provider
+        image_path = str(tmp_path / 'page.png')
+        Image.new('RGB', (40, 20), color='black').save(image_path)
+        elements = [EditableElement(element_id='t1', element_type='text', bbox=BBox(0, 0, 10, 10),
+                                    bbox_global=BBox(0, 0, 10, 10))]
+
+        output = service._generate_clean_background(
+            image_path=image_path,
+            elements=elements,
+            image_id='img1',
+            depth=0,
+            parent_bbox=None,
+            root_image_path=image_path,
+            image_size=(40, 20),
+        )
+
+        assert output is not None
+        assert provider.calls == [[(0, 0, 10, 10)]]
+        with Image.open(output) as result:
+            assert result.size == (40, 20)
+            assert result.getpixel((5, 5)) == (255, 255, 255)
+            assert result.getpixel((30, 15)) == (0, 0, 0)
+
+    def test_forwards_configured_inpaint_options(self, tmp_path):
+        provider = _PixelReadingInpaintProvider()
+        config = ServiceConfig(
+            upload_folder=Path(tmp_path),
+            extractor_registry=ExtractorRegistry(),
+            inpaint_registry=InpaintProviderRegistry().register_default(provider),
+            inpaint_options={'tiled': True, 'tile_size': 512, 'tile_overlap': 64},
+        )
+        service = ImageEditabilityService(config)
+        image_path = str(tmp_path / 'page.png')
+        Image.new('RGB', (40, 20), color='black').save(image_path)
+        elements = [EditableElement(element_id='t1', element_type='text', bbox=BBox(0, 0, 10, 10),
+                                    bbox_global=BBox(0, 0, 10, 10))]
+
+        service._generate_clean_background(
+            image_path=image_path,
+            elements=elements,
+            image_id='img1',
+            depth=0,
+            parent_bbox=None,
+            root_image_path=image_path,
+            image_size=(40, 20),
+        )
+
+        assert len(provider.kwargs) == 1
+        assert provider.kwargs[0]['tiled'] is True
+        assert provider.kwargs[0]['tile_size'] == 512
+        assert provider.kwargs[0]['tile_overlap'] == 64
+
+
+class _RecordingEditAIService:
+    """Stub AI service returning a fixed-size white image for every edit"""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def edit_image(self, prompt, current_image_path, aspect_ratio, resolution, **kwargs):
+        with self._lock:
+            self.calls.append((current_image_path.size, aspect_ratio, threading.current_thread().name))
+        return Image.new('RGB', (64, 64), color='white')
+
+
+@pytest.mark.unit
+class TestTileAndInpaint:
+    """GenerativeEditInpaintProvider tiled inpainting tests"""
+
+    def test_square_tiles_run_in_shared_ai_pool(self, monkeypatch):
+        monkeypatch.setattr(GenerativeEditInpaintProvider, 'edit_instruction', 'clean')
+        ai_service = _RecordingEditAIService()
+        provider = GenerativeEditInpaintProvider(ai_service)
+
+        result = provider._tile_and_inpaint(Image.new('RGB', (300, 120)), '1K', tile_size=100, overlap=20)
+
+        assert result.size == (300, 120)
+        assert result.getpixel((150, 60)) == (255, 255, 255)
+        # 2 rows x 4 columns of overlapping 100px tiles
+        assert len(ai_service.calls) == 8
+        assert {(size, aspect) for size, aspect, _ in ai_service.calls} == {((100, 100), '1:1')}
+        assert all(name.startswith('ai-call') for _, _, name in ai_service.calls)
@@ -0,0 +1,85 @@
+"""
+PDF splitting tests
+"""
+import json
+import os
+
+import pytest
+from PyPDF2 import PdfReader, PdfWriter
+
+from services.pdf_service import split_pdf_to_pages, iter_split_pdf_pages, SPLIT_META_FILENAME
+
+
+@pytest.fixture
+def three_page_pdf(tmp_path):
+    writer = PdfWriter()
+    for width in (100, 200, 300):
+        writer.add_blank_page(width=width, height=100)
+    pdf_path = tmp_path / 'deck.pdf'
+    with open(pdf_path, 'wb') as f:
+        writer.write(f)
+    return str(pdf_path)
+
+
+@pytest.mark.unit
+class TestSplitPdf:
+    """split_pdf_to_pages / iter_split_pdf_pages tests"""
+
+    def test_split_writes_one_file_per_page_in_order(self, three_page_pdf, tmp_path):
+        paths = split_pdf_to_pages(three_page_pdf, str(tmp_path / 'split'))
+
+        assert [os.path.basename(p) for p in paths] == ['page_1.pdf', 'page_2.pdf', 'page_3.pdf']
+        widths = [float(PdfReader(p).pages[0].mediabox.width) for p in paths]
+        assert widths == [100, 200, 300]
+
+    def test_iter_split_writes_pages_lazily(self, three_page_pdf, tmp_path):
+        split_dir = tmp_path / 'split'
+        page_count, page_iter = iter_split_pdf_pages(three_page_pdf, str(split_dir))
+
+        assert page_count == 3
+        assert os.listdir(split_dir) == []
+        first = next(page_iter)
+        assert os.listdir(split_dir) == ['page_1.pdf']
+        assert [first] + list(page_iter) == [str(split_dir / f'page_{i}.pdf') for i in (1, 2, 3)]
+
+    def test_reuses_complete_split_of_same_pdf(self, three_page_pdf, tmp_path, monkeypatch):
+        split_dir = str(tmp_path / 'split')
+        first = split_pdf_to_pages(three_page_pdf, split_dir)
+        assert os.path.exists(os.path.join(split_dir, SPLIT_META_FILENAME))
+
+        def fail(*args, **kwargs):
+            raise AssertionError('PDF should not be parsed again')
+
+        monkeypatch.setattr('services.pdf_service.PdfReader', fail)
+        assert split_pdf_to_pages(three_page_pdf, split_dir) == first
+
+    def test_stopped_split_records_written_pages_and_resumes(self, three_page_pdf, tmp_path, monkeypatch):
+        split_dir = str(tmp_path / 'split')
+        _, page_iter = iter_split_pdf_pages(three_page_pdf, split_dir)
+        next(page_iter)
+        page_iter.close()
+        with open(os.path.join(split_dir, SPLIT_META_FILENAME), encoding='utf-8') as f:
+            assert json.load(f)['pages_written'] == 1
+
+        written = []
+        original_add_page = PdfWriter.add_page
+        monkeypatch.setattr(PdfWriter, 'add_page', lambda self, page: written.append(page) or original_add_page(self, page))
+        page_count, page_iter = iter_split_pdf_pages(three_page_pdf, split_dir)
+        paths = list(page_iter)
+
+        assert page_count == 3
+        assert paths == [os.path.join(split_dir, f'page_{i}.pdf') for i in (1, 2, 3)]
+        assert len(written) == 2
+        widths = [float(PdfReader(p).pages[0].mediabox.width) for p in paths]
+        assert widths == [100, 200, 300]
+
+    def test_resplits_changed_pdf(self, three_page_pdf, tmp_path):
+        split_dir = str(tmp_path / 'split')
+        split_pdf_to_pages(three_page_pdf, split_dir)
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        with open(three_page_pdf, 'wb') as f:
+            writer.write(f)
+        os.utime(three_page_pdf, ns=(0, 0))
+
+        assert len(split_pdf_to_pages(three_page_pdf, split_dir)) == 1
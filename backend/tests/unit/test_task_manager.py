@@ -0,0 +1,324 @@
+"""
+Task manager helper tests
+"""
+import io
+import os
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+
+from models import db, Project, Page, PageImageVersion, Task
+from services import task_manager
+from services.file_service import FileService
+from services.task_manager import (
+    save_image_with_version, _ensure_worker_app_context,
+    _next_version_numbers, _bulk_save_image_versions, _get_caption_extractor,
+    _finalize_task, _mark_task_processing, _save_image_files, _staged_image_key,
+)
+
+
+@pytest.fixture
+def page(client):
+    """Create a project with a single page"""
+    project = Project(creation_type='idea', idea_prompt='test')
+    db.session.add(project)
+    db.session.commit()
+    page = Page(project_id=project.id, order_index=0)
+    db.session.add(page)
+    db.session.commit()
+    return page
+
+
+@pytest.mark.unit
+class TestSaveImageWithVersion:
+    """save_image_with_version versioning tests"""
+
+    def test_versions_increment_and_only_latest_is_current(self, page, temp_upload_dir):
+        file_service = FileService(temp_upload_dir)
+        image = Image.new('RGB', (32, 18), color='blue')
+
+        for expected in (1, 2, 3):
+            _, version = save_image_with_version(
+                image, page.project_id, page.id, file_service, page_obj=page
+            )
+            assert version == expected
+
+        versions = PageImageVersion.query.filter_by(page_id=page.id).all()
+        assert sorted(v.version_number for v in versions) == [1, 2, 3]
+        assert [v.version_number for v in versions if v.is_current] == [3]
+        assert page.generated_image_path.endswith('_v3.png')
+        assert page.status == 'COMPLETED'
+
+    def test_lazily_opened_image_saves_original_and_thumbnail(self, page, temp_upload_dir):
+        file_service = FileService(temp_upload_dir)
+        buffer = io.BytesIO()
+        Image.new('RGB', (32, 18), color='blue').save(buffer, format='PNG')
+        buffer.seek(0)
+        image = Image.open(buffer)
+
+        save_image_with_version(image, page.project_id, page.id, file_service, page_obj=page)
+
+        # 保存前已完成解码，原图和缩略图共享同一份像素数据
+        assert image.im is not None
+        with Image.open(file_service.get_absolute_path(page.generated_image_path)) as saved:
+            assert saved.size == (32, 18)
+        with Image.open(file_service.get_absolute_path(page.cached_image_path)) as cached:
+            assert cached.size == (32, 18)
+
+    def test_version_continues_after_deleted_versions(self, page, temp_upload_dir):
+        file_service = FileService(temp_upload_dir)
+        image = Image.new('RGB', (32, 18), color='red')
+        db.session.add(PageImageVersion(page_id=page.id, image_path='old.png', version_number=5))
+        db.session.commit()
+
+        _, version = save_image_with_version(image, page.project_id, page.id, file_service)
+        assert version == 6
+
+    def test_version_follows_max_when_older_version_is_current(self, page, temp_upload_dir):
+        file_service = FileService(temp_upload_dir)
+        image = Image.new('RGB', (32, 18), color='green')
+        db.session.add(PageImageVersion(page_id=page.id, image_path='v1.png', version_number=1, is_current=True))
+        db.session.add(PageImageVersion(page_id=page.id, image_path='v2.png', version_number=2))
+        db.session.commit()
+
+        _, version = save_image_with_version(image, page.project_id, page.id, file_service)
+        assert version == 3
+        current = PageImageVersion.query.filter_by(page_id=page.id, is_current=True).all()
+        assert [v.version_number for v in current] == [3]
+
+
+@pytest.mark.unit
+class TestBulkSaveImageVersions:
+    """Batched version insert tests used by generate_images_task"""
+
+    def test_next_version_numbers(self, page):
+        other = Page(project_id=page.project_id, order_index=1)
+        db.session.add(other)
+        db.session.add(PageImageVersion(page_id=page.id, image_path='v4.png', version_number=4))
+        db.session.commit()
+
+        assert _next_version_numbers([page.id, other.id]) == {page.id: 5, other.id: 1}
+
+    def _save_staged_files(self, page, file_service, color='blue'):
+        image_path, cached_image_path = _save_image_files(
+            Image.new('RGB', (32, 18), color=color), page.project_id,
+            _staged_image_key(page.id, 'task-1'), file_service, 0
+        )
+        return {
+            'page_id': page.id,
+            'project_id': page.project_id,
+            'image_path': image_path,
+            'cached_image_path': cached_image_path,
+        }
+
+    def test_bulk_save_switches_current_version_and_updates_page(self, page, temp_upload_dir):
+        file_service = FileService(temp_upload_dir)
+        db.session.add(PageImageVersion(page_id=page.id, image_path='v1.png', version_number=1, is_current=True))
+        db.session.commit()
+
+        saved = self._save_staged_files(page, file_service)
+        staged_paths = (saved['image_path'], saved['cached_image_path'])
+        _bulk_save_image_versions([saved], file_service)
+        db.session.commit()
+
+        current = PageImageVersion.query.filter_by(page_id=page.id, is_current=True).all()
+        assert [v.version_number for v in current] == [2]
+        refreshed = db.session.get(Page, page.id)
+        assert refreshed.generated_image_path == current[0].image_path
+        assert refreshed.generated_image_path == f"{page.project_id}/pages/{page.id}_v2.png"
+        assert refreshed.cached_image_path == file_service.get_cached_image_path(page.project_id, page.id, 2)
+        assert refreshed.status == 'COMPLETED'
+        # 临时文件已改名为正式版本文件
+        assert file_service.file_exists(refreshed.generated_image_path)
+        assert file_service.file_exists(refreshed.cached_image_path)
+        assert not any(file_service.file_exists(path) for path in staged_paths)
+
+    def test_bulk_save_does_not_clash_with_version_saved_meanwhile(self, page, temp_upload_dir):
+        file_service = FileService(temp_upload_dir)
+        saved = self._save_staged_files(page, file_service, color='blue')
+
+        # 批量任务生成期间，编辑操作先保存了一个新版本
+        save_image_with_version(Image.new('RGB', (32, 18), color='red'),
+                                page.project_id, page.id, file_service)
+
+        _bulk_save_image_versions([saved], file_service)
+        db.session.commit()
+
+        versions = PageImageVersion.query.filter_by(page_id=page.id).order_by(
+            PageImageVersion.version_number).all()
+        assert [(v.version_number, v.is_current) for v in versions] == [(1, False), (2, True)]
+        with Image.open(file_service.get_absolute_path(versions[0].image_path)) as edited:
+            assert edited.getpixel((0, 0)) == (255, 0, 0)
+        with Image.open(file_service.get_absolute_path(versions[1].image_path)) as generated:
+            assert generated.getpixel((0, 0)) == (0, 0, 255)
+
+
+    def test_failed_rename_is_undone_and_rollback_keeps_current_version(self, page, temp_upload_dir):
+        file_service = FileService(temp_upload_dir)
+        db.session.add(PageImageVersion(page_id=page.id, image_path='v1.png', version_number=1, is_current=True))
+        db.session.commit()
+        saved = self._save_staged_files(page, file_service)
+        os.remove(file_service.get_absolute_path(saved['cached_image_path']))
+
+        with pytest.raises(FileNotFoundError):
+            _bulk_save_image_versions([saved], file_service)
+        db.session.rollback()
+
+        current = PageImageVersion.query.filter_by(page_id=page.id, is_current=True).all()
+        assert [v.version_number for v in current] == [1]
+        assert PageImageVersion.query.filter_by(page_id=page.id).count() == 1
+        # 已改名的原图被还原为临时文件名
+        assert file_service.file_exists(saved['image_path'])
+        assert not file_service.file_exists(f"{page.project_id}/pages/{page.id}_v2.png")
+
+
+@pytest.mark.unit
+class TestGenerateImagesTask:
+    """generate_images_task failure handling tests"""
+
+    def _ai_service(self):
+        ai_service = MagicMock()
+        ai_service.flatten_outline.return_value = [{'title': 'p'}]
+        ai_service.extract_image_urls_from_markdown.return_value = []
+        ai_service.generate_image_prompt.return_value = 'prompt'
+        ai_service.generate_image.side_effect = lambda *args, **kwargs: Image.new('RGB', (64, 36))
+        return ai_service
+
+    def test_parent_failure_marks_unsaved_pages_failed(self, app, page, temp_upload_dir, monkeypatch):
+        page.set_description_content({'text': 'desc'})
+        task = Task(project_id=page.project_id, task_type='GENERATE_IMAGES')
+        db.session.add(task)
+        db.session.commit()
+
+        def fail(*args, **kwargs):
+            raise RuntimeError('db write failed')
+
+        monkeypatch.setattr(task_manager, '_bulk_save_image_versions', fail)
+        task_manager.generate_images_task(
+            task.id, page.project_id, self._ai_service(), FileService(temp_upload_dir), [],
+            use_template=False, max_workers=1, resolution='1K', app=app
+        )
+
+        db.session.expire_all()
+        refreshed_task = db.session.get(Task, task.id)
+        assert refreshed_task.status == 'FAILED'
+        assert refreshed_task.error_message == 'db write failed'
+        assert db.session.get(Page, page.id).status == 'FAILED'
+        # 未写入数据库的临时图片文件已删除
+        pages_dir = os.path.join(temp_upload_dir, page.project_id, 'pages')
+        assert [name for name in os.listdir(pages_dir) if task.id in name] == []
+
+
+@pytest.mark.unit
+class TestFinalizeTask:
+    """_finalize_task terminal status write tests"""
+
+    def test_writes_status_progress_and_error_in_one_update(self, page):
+        task = Task(project_id=page.project_id, task_type='GENERATE_IMAGES', status='PROCESSING')
+        db.session.add(task)
+        db.session.commit()
+
+        progress = {'total': 1, 'failed': 1, 'current_step': '导出失败'}
+        _finalize_task(task.id, 'FAILED', progress=progress, error_message='boom')
+        db.session.commit()
+
+        refreshed = db.session.get(Task, task.id)
+        assert refreshed.status == 'FAILED'
+        assert refreshed.error_message == 'boom'
+        assert refreshed.completed_at is not None
+        assert refreshed.get_progress() == progress
+        # 紧凑编码，中文不转义
+        assert refreshed.progress == '{"total":1,"failed":1,"current_step":"导出失败"}'
+
+    def test_keeps_existing_progress_when_not_given(self, page):
+        task = Task(project_id=page.project_id, task_type='GENERATE_DESCRIPTIONS', status='PROCESSING')
+        task.set_progress({'total': 3, 'completed': 3})
+        db.session.add(task)
+        db.session.commit()
+
+        _finalize_task(task.id, 'COMPLETED')
+        db.session.commit()
+
+        refreshed = db.session.get(Task, task.id)
+        assert refreshed.status == 'COMPLETED'
+        assert refreshed.error_message is None
+        assert refreshed.get_progress() == {'total': 3, 'completed': 3}
+
+
+@pytest.mark.unit
+class TestMarkTaskProcessing:
+    """_mark_task_processing start status write tests"""
+
+    def test_marks_existing_task(self, page):
+        task = Task(project_id=page.project_id, task_type='GENERATE_IMAGES', status='PENDING')
+        db.session.add(task)
+        db.session.commit()
+
+        assert _mark_task_processing(task.id) is True
+        assert db.session.get(Task, task.id).status == 'PROCESSING'
+
+    def test_missing_task(self, client):
+        assert _mark_task_processing('missing-task') is False
+
+
+@pytest.mark.unit
+class TestWorkerAppContext:
+    """_ensure_worker_app_context session isolation tests"""
+
+    def test_each_worker_thread_owns_its_session(self, app):
+        sessions = {}
+
+        def worker(name):
+            _ensure_worker_app_context(app)
+            first = db.session()
+            _ensure_worker_app_context(app)
+            sessions[name] = (first, db.session())
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in ('a', 'b')]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sessions['a'][0] is sessions['a'][1]
+        assert sessions['b'][0] is sessions['b'][1]
+        assert sessions['a'][0] is not sessions['b'][0]
+
+    def test_switching_app_pops_previous_context(self, app):
+        from flask import Flask, current_app, has_app_context
+        other = Flask('other')
+        seen = {}
+
+        def worker():
+            _ensure_worker_app_context(app)
+            _ensure_worker_app_context(other)
+            seen['app'] = current_app._get_current_object()
+            task_manager._worker_local.app_ctx.pop()
+            # 旧上下文已被弹出，弹出当前上下文后线程内不再有应用上下文
+            seen['left_over'] = has_app_context()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert seen == {'app': other, 'left_over': False}
+
+
+@pytest.mark.unit
+class TestCaptionExtractorCache:
+    """_get_caption_extractor reuse tests"""
+
+    def test_reused_for_same_ai_service_and_replaced_on_change(self):
+        _get_caption_extractor.cache_clear()
+        first_service, second_service = object(), object()
+
+        extractor = _get_caption_extractor(first_service)
+        assert _get_caption_extractor(first_service) is extractor
+        assert extractor.ai_service is first_service
+
+        replaced = _get_caption_extractor(second_service)
+        assert replaced is not extractor
+        assert replaced.ai_service is second_service
+        _get_caption_extractor.cache_clear()
@@ -0,0 +1,45 @@
+"""
+Shared AI call thread pool
+
+所有后台任务和服务共用的 AI 调用线程池，放在独立模块中，任务编排（task_manager）和
+底层服务（如生成式重绘）都可以直接导入，不互相依赖
+"""
+import itertools
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator
+
+from config import get_config
+
+# 所有任务共享的 AI 调用线程池，避免每个任务各自创建线程池；单个任务的并发由 run_in_ai_pool 限制
+ai_call_pool = ThreadPoolExecutor(
+    max_workers=get_config().MAX_AI_CALL_WORKERS, thread_name_prefix='ai-call'
+)
+
+
+def run_in_ai_pool(func: Callable, args_list: Iterable[tuple], max_in_flight: int) -> Iterator:
+    """
+    在共享 AI 线程池中执行 func(*args)，按完成顺序逐个返回 Future
+
+    同一时刻本任务最多有 max_in_flight 个调用在池中，每完成一个再补交一个，
+    从而在共享线程池上保留每个任务各自的并发上限。args_list 按需逐个读取，
+    可以传入生成器，存活的 Future 数量与页数无关。调用方关闭生成器后，
+    剩余参数不再提交，已排队未执行的调用会被取消。
+    """
+    args_iter = iter(args_list)
+    pending = set()
+    try:
+        for args in args_iter:
+            pending.add(ai_call_pool.submit(func, *args))
+            if len(pending) >= max_in_flight:
+                break
+        while pending:
+            # 每次唤醒一并处理所有已完成的 Future：先把空出的名额全部补交，再交给调用方处理结果，
+            # 调用方写库等耗时操作不会推迟下一批 AI 调用的开始
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for next_args in itertools.islice(args_iter, len(done)):
+                pending.add(ai_call_pool.submit(func, *next_args))
+            yield from done
+    finally:
+        # 调用方提前停止迭代（close() 或异常）时，取消尚未开始执行的调用，不再提交剩余参数
+        for future in pending:
+            future.cancel()
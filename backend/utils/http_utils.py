@@ -0,0 +1,37 @@
+"""
+HTTP utility functions
+"""
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import get_config
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the process-wide requests.Session shared by all worker threads.
+
+    Reusing one session keeps TCP/TLS connections to the same host alive
+    across requests (MinerU polling, result downloads, image downloads),
+    instead of opening a new connection for every call.
+
+    Returns:
+        Shared requests.Session instance
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = get_config().MAX_AI_CALL_WORKERS
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
@@ -5,26 +5,37 @@ from typing import Tuple
 from PIL import Image
 
 
-def check_image_resolution(image: Image.Image, expected_resolution: str) -> Tuple[str, bool]:
+def get_resolution_category(image: Image.Image) -> str:
     """
-    Check if the actual image resolution matches expected resolution.
+    Get the resolution category ("1K", "2K", "4K") of an image from its size.
     
     Args:
         image: PIL Image object
-        expected_resolution: Expected resolution setting ("1K", "2K", "4K")
         
     Returns:
-        Tuple of (actual_resolution_category, is_match)
+        Resolution category
     """
-    max_dimension = max(image.width, image.height)
+    max_dimension = max(image.size)
     
-    # Determine actual resolution category
     if max_dimension < 1500:
-        actual = "1K"
+        return "1K"
     elif max_dimension < 3000:
-        actual = "2K"
+        return "2K"
     else:
-        actual = "4K"
+        return "4K"
+
+
+def check_image_resolution(image: Image.Image, expected_resolution: str) -> Tuple[str, bool]:
+    """
+    Check if the actual image resolution matches expected resolution.
     
+    Args:
+        image: PIL Image object
+        expected_resolution: Expected resolution setting ("1K", "2K", "4K")
+        
+    Returns:
+        Tuple of (actual_resolution_category, is_match)
+    """
+    actual = get_resolution_category(image)
     is_match = actual == expected_resolution.upper()
     return actual, is_match
@@ -2,6 +2,7 @@
 PPTX Builder - utilities for creating editable PPTX files
 Based on OpenDCAI/DataFlow-Agent's implementation
 """
+import io
 import os
 import logging
 from datetime import datetime, timezone
@@ -504,7 +505,8 @@ class PPTXBuilder:
         slide,
         image_path: str,
         bbox: List[int],
-        dpi: int = None
+        dpi: int = None,
+        image_data: Optional[bytes] = None
     ):
         """
         Add image element to slide
@@ -514,11 +516,12 @@ class PPTXBuilder:
             image_path: Path to image file
             bbox: Bounding box [x0, y0, x1, y1] in pixels
             dpi: DPI for conversion (default: 96)
+            image_data: Image file bytes already read from image_path (optional, skips disk access)
         """
         dpi = dpi or self.DEFAULT_DPI
         
         # Check if image exists
-        if not os.path.exists(image_path):
+        if image_data is None and not os.path.exists(image_path):
             logger.warning(f"Image not found: {image_path}, adding placeholder")
             self.add_image_placeholder(slide, bbox, dpi)
             return
@@ -531,7 +534,8 @@ class PPTXBuilder:
         
         try:
             # Add image
-            slide.shapes.add_picture(image_path, left, top, width, height)
+            image_file = io.BytesIO(image_data) if image_data is not None else image_path
+            slide.shapes.add_picture(image_file, left, top, width, height)
             logger.debug(f"Added image: {image_path} at bbox {bbox}")
         except Exception as e:
             logger.error(f"Failed to add image {image_path}: {str(e)}")
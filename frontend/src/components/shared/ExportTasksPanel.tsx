@@ -93,6 +93,10 @@ const WarningsModal: React.FC<{
   
   if (!isOpen) return null;
   
+  // 明细列表可能被后端截断，总数 = 列表长度 + 省略条数
+  const styleFailedCount = (warningDetails?.style_extraction_failed?.length ?? 0) + (warningDetails?.truncated?.style_extraction_failed ?? 0);
+  const textFailedCount = (warningDetails?.text_render_failed?.length ?? 0) + (warningDetails?.truncated?.text_render_failed ?? 0);
+  
   return (
     <div className="fixed inset-0 z-50 flex items-center justify-center">
       <div className="absolute inset-0 bg-black/50" onClick={onClose} />
@@ -133,7 +137,7 @@ const WarningsModal: React.FC<{
               {warningDetails.style_extraction_failed?.length > 0 && (
                 <div className="mb-3">
                   <p className="text-xs text-gray-500 dark:text-foreground-tertiary mb-1">
-                    {t('export.styleExtractionFailed', { count: warningDetails.style_extraction_failed.length })}
+                    {t('export.styleExtractionFailed', { count: styleFailedCount })}
                   </p>
                   <div className="text-xs text-gray-600 dark:text-foreground-tertiary bg-gray-50 dark:bg-background-primary p-2 rounded max-h-32 overflow-y-auto">
                     {warningDetails.style_extraction_failed.slice(0, 10).map((item: any, idx: number) => (
@@ -141,9 +145,9 @@ const WarningsModal: React.FC<{
                         • {item.element_id}: {item.reason}
                       </div>
                     ))}
-                    {warningDetails.style_extraction_failed.length > 10 && (
+                    {styleFailedCount > 10 && (
                       <div className="text-gray-400 mt-1">
-                        {t('export.moreItems', { count: warningDetails.style_extraction_failed.length - 10 })}
+                        {t('export.moreItems', { count: styleFailedCount - 10 })}
                       </div>
                     )}
                   </div>
@@ -153,7 +157,7 @@ const WarningsModal: React.FC<{
               {warningDetails.text_render_failed?.length > 0 && (
                 <div className="mb-3">
                   <p className="text-xs text-gray-500 dark:text-foreground-tertiary mb-1">
-                    {t('export.textRenderFailed', { count: warningDetails.text_render_failed.length })}
+                    {t('export.textRenderFailed', { count: textFailedCount })}
                   </p>
                   <div className="text-xs text-gray-600 dark:text-foreground-tertiary bg-gray-50 dark:bg-background-primary p-2 rounded max-h-32 overflow-y-auto">
                     {warningDetails.text_render_failed.slice(0, 10).map((item: any, idx: number) => (
@@ -26,6 +26,7 @@ export interface ExportTask {
       image_add_failed?: Array<{ path: string; reason: string }>;
       json_parse_failed?: Array<{ context: string; reason: string }>;
       other_warnings?: string[];
+      truncated?: Record<string, number>;  // 各类明细被省略的条数
       total_warnings?: number;
     };
   };